@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pydub import AudioSegment
+from audio_converter import FORMATS, convert_file
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SAMPLE_RATE = 44100
+
+# ffmpeg lavfi sources for the synthetic signals; all are deterministic
+SIGNALS = {
+    # Two steady tones, one per channel
+    'tone': "aevalsrc=0.5*sin(2*PI*440*t)|0.5*sin(2*PI*660*t):s={rate}:d={duration}",
+    # Seeded pink noise, the hardest case for lossy encoders
+    'noise': "anoisesrc=color=pink:seed=42:amplitude=0.3:r={rate}:d={duration}",
+    # Voiced harmonics shaped into syllables (3.5 Hz) and phrases with pauses
+    'speech': ("aevalsrc=(0.3*sin(2*PI*140*t)+0.2*sin(2*PI*280*t)+0.1*sin(2*PI*720*t)"
+               "+0.05*sin(2*PI*1200*t))*pow(abs(sin(2*PI*3.5*t))\\,2)*gt(sin(2*PI*0.23*t)\\,-0.4)"
+               ":s={rate}:d={duration}"),
+}
+
+# Lossless formats ignore the bitrate, so they are measured once
+LOSSLESS_FORMATS = ['wav', 'flac']
+
+DEFAULT_BITRATES = ['128', '192', '320']
+
+def generate_signal(folder, name, duration):
+    """Render a synthetic signal to a stereo WAV file with ffmpeg; reused if present."""
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{name}_{duration}s.wav")
+    if not os.path.exists(path):
+        source = SIGNALS[name].format(rate=SAMPLE_RATE, duration=duration)
+        subprocess.run([AudioSegment.converter, '-v', 'error', '-y', '-f', 'lavfi', '-i', source,
+                        '-ac', '2', '-acodec', 'pcm_s16le', path + '.partial.wav'], check=True)
+        os.replace(path + '.partial.wav', path)
+    return path
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its largest child, in MB."""
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+def measure_conversion(source_path, target_path, target_format, bitrate, streaming):
+    """Run one conversion; meant for a fresh process so peak RSS is its own."""
+    stats = convert_file(source_path, target_path, target_format, bitrate, streaming)
+    own_rss, child_rss = peak_rss_mb()
+    return {
+        'audio_seconds': stats['audio_seconds'],
+        'wall_seconds': stats['seconds'],
+        'realtime_factor': stats['audio_seconds'] / stats['seconds'] if stats['seconds'] else 0,
+        'peak_rss_mb': own_rss,
+        'peak_child_rss_mb': child_rss,
+        'output_bytes': os.path.getsize(target_path),
+    }
+
+def benchmark_combinations(formats, bitrates):
+    """(format, bitrate) pairs to measure; lossless formats once, without a bitrate."""
+    for target_format in formats:
+        if target_format in LOSSLESS_FORMATS:
+            yield target_format, None
+        else:
+            for bitrate in bitrates:
+                yield target_format, f"{bitrate}k"
+
+def run_benchmark(signal_paths, formats, bitrates, streaming=None):
+    """Convert every signal to every combination and measure each run."""
+    output_folder = tempfile.mkdtemp(prefix='audio_bench_')
+    results = []
+    try:
+        for name, source_path in signal_paths.items():
+            for target_format, bitrate in benchmark_combinations(formats, bitrates):
+                target_path = os.path.join(output_folder, f"{name}.{target_format}")
+                # A new single-use process per run keeps RSS figures independent
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    try:
+                        result = pool.submit(measure_conversion, source_path, target_path,
+                                             target_format, bitrate, streaming).result()
+                    except Exception as e:
+                        print(f"Error converting {name} to {target_format} {bitrate or ''}: {str(e)}")
+                        result = {'error': str(e)}
+                result.update({'signal': name, 'format': target_format, 'bitrate': bitrate})
+                if 'output_bytes' in result and result['audio_seconds']:
+                    result['output_kbps'] = result['output_bytes'] * 8 / result['audio_seconds'] / 1000
+                results.append(result)
+                if os.path.exists(target_path):
+                    os.remove(target_path)
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+    return results
+
+def result_key(result):
+    return f"{result['signal']}/{result['format']}/{result['bitrate'] or 'lossless'}"
+
+def compare_to_baseline(results, baseline, tolerance=0.10):
+    """Return a list of regressions of results against a stored baseline run."""
+    previous = {result_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        base = previous.get(result_key(result))
+        if not base or 'error' in result or 'error' in base:
+            continue
+        key = result_key(result)
+        if base.get('realtime_factor') and result['realtime_factor'] < base['realtime_factor'] * (1 - tolerance):
+            regressions.append(f"{key} realtime_factor: {result['realtime_factor']:.1f} "
+                               f"< baseline {base['realtime_factor']:.1f}")
+        for field in ('peak_rss_mb', 'peak_child_rss_mb'):
+            if base.get(field) and result[field] and result[field] > base[field] * (1 + tolerance):
+                regressions.append(f"{key} {field}: {result[field]:.1f} > baseline {base[field]:.1f}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark audio_converter on reproducible synthetic signals (offline, local ffmpeg)"
+    )
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), 'audio_bench_corpus'),
+                        help="Folder for the generated signals (reused if present)")
+    parser.add_argument("--duration", type=int, default=60, help="Signal length in seconds (default: 60)")
+    parser.add_argument("--signals", default=",".join(SIGNALS),
+                        help=f"Signals to use (default: {','.join(SIGNALS)})")
+    parser.add_argument("--formats", default=",".join(f.lower() for f in FORMATS),
+                        help="Target formats (default: all)")
+    parser.add_argument("--bitrates", default=",".join(DEFAULT_BITRATES),
+                        help=f"Bitrates in kbps for lossy formats (default: {','.join(DEFAULT_BITRATES)})")
+    parser.add_argument("--stream", action="store_const", const=True, default=None,
+                        help="Measure the constant-memory streaming path instead of pydub")
+    parser.add_argument("--output", help="Write the result JSON to this file")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON; exit 1 on regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the --baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression fraction (default: 0.10)")
+    args = parser.parse_args()
+
+    signals = [name.strip() for name in args.signals.split(',') if name.strip()]
+    formats = [name.strip().lower() for name in args.formats.split(',') if name.strip()]
+    bitrates = [rate.strip().rstrip('k') for rate in args.bitrates.split(',') if rate.strip()]
+    for name in signals:
+        if name not in SIGNALS:
+            parser.error(f"Unknown signal: {name}")
+    for target_format in formats:
+        if target_format.upper() not in FORMATS:
+            parser.error(f"Unknown format: {target_format}")
+
+    signal_paths = {name: generate_signal(args.corpus, name, args.duration) for name in signals}
+    settings = {
+        'duration': args.duration,
+        'signals': signals,
+        'formats': formats,
+        'bitrates': bitrates,
+        'streaming': bool(args.stream),
+    }
+    result = {'settings': settings, 'results': run_benchmark(signal_paths, formats, bitrates, args.stream)}
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+
+    if args.baseline:
+        if args.save_baseline:
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                f.write(output)
+            print(f"Baseline saved to {args.baseline}")
+        else:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('settings') != result['settings']:
+                print("Warning: baseline was recorded with different settings.")
+            regressions = compare_to_baseline(result['results'], baseline, args.tolerance)
+            if regressions:
+                print("Regressions against baseline:")
+                for line in regressions:
+                    print(f"  {line}")
+                sys.exit(1)
+            print("No regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
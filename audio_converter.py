@@ -1,7 +1,928 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pydub import AudioSegment
+from pydub.utils import mediainfo_json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import os
+import sys
+import json
+import time
+import queue
+import shutil
+import struct
+import hashlib
+import math
+import argparse
+import tempfile
+import threading
+import subprocess
+
+try:
+    import numpy as np
+except ImportError:  # loudness normalization is unavailable without NumPy
+    np = None
+
+# Output formats offered in the combobox
+FORMATS = ["MP3", "WAV", "OGG", "FLAC", "M4A"]
+
+# Input extensions picked up by folder conversion
+SUPPORTED_EXTENSIONS = ['.mp3', '.wav', '.ogg', '.flac', '.m4a']
+
+# Tags written into every converted file
+TAGS = {'converted_by': 'Audio Converter'}
+
+# Codecs whose decoders report float samples that carry no more than 16 bits
+LOSSY_CODECS = ['mp3', 'aac', 'vorbis', 'opus', 'mp4', 'webm', 'ogg']
+
+# Bytes of PCM relayed per read on the streaming path
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+# Files larger than this are streamed instead of decoded into memory
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+# Loudness normalization: default target and the peak level gain may not exceed
+DEFAULT_TARGET_LUFS = -16.0
+PEAK_CEILING_DBFS = -1.0
+
+# Samples converted to float per NumPy operation during analysis
+ANALYSIS_BLOCK_SAMPLES = 1 << 20
+
+# Formats whose separately encoded segments join without gaps. Ogg Vorbis
+# links chain by plain concatenation and each decodes sample-exact; MP3 and
+# M4A add encoder delay and padding to every segment, and FLAC frame numbers
+# would restart at each join, so those fall back to a single stream.
+SPLIT_FORMATS = ['ogg']
+
+# Split mode: shortest segment worth encoding on its own, and how far from
+# an even split to look for the quietest place to cut
+MIN_SEGMENT_SECONDS = 60
+SPLIT_SEARCH_SECONDS = 20
+
+# Default transcode cache location and size cap
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.audio_converter_cache')
+DEFAULT_CACHE_MB = 2048
+
+# How often the UI checks for background results, in milliseconds
+POLL_INTERVAL_MS = 100
+
+def export_format(target_format):
+    """ffmpeg muxer name for a target extension (M4A files use the mp4 muxer)."""
+    return 'mp4' if target_format == 'm4a' else target_format
+
+def encoder_args(target_format, bitrate, tags=TAGS, sample_width=2):
+    """ffmpeg output options matching what pydub's export passes for a format.
+    
+    sample_width is that of the PCM fed in; WAV output keeps it, as pydub does.
+    """
+    args = []
+    if target_format == 'ogg':
+        args += ['-acodec', 'libvorbis']
+    if target_format == 'wav':
+        args += ['-acodec', pcm_codec(sample_width)]
+    if bitrate:
+        args += ['-b:a', bitrate]
+    for key, value in (tags or {}).items():
+        args += ['-metadata', f'{key}={value}']
+    if target_format == 'mp3':
+        args += ['-id3v2_version', '4']
+    return args + ['-f', export_format(target_format)]
+
+def pcm_codec(sample_width):
+    """ffmpeg codec name of little-endian PCM with sample_width bytes."""
+    return 'pcm_u8' if sample_width == 1 else f'pcm_s{8 * sample_width}le'
+
+def raw_pcm_format(sample_width):
+    """ffmpeg demuxer name for headerless PCM with sample_width bytes."""
+    return pcm_codec(sample_width)[len('pcm_'):]
+
+def source_sample_width(source_path):
+    """Bytes per sample that decode source_path without losing depth: 2 or 4.
+    
+    Follows AudioSegment.from_file: sources with more than 16 bits (24-bit
+    FLAC or WAV masters) decode to 32-bit, lossy codecs to 16-bit. Falls
+    back to 16-bit if the file can't be probed.
+    """
+    try:
+        info = mediainfo_json(source_path)
+    except Exception:
+        return 2
+    streams = [stream for stream in info.get('streams', []) if stream.get('codec_type') == 'audio']
+    if not streams or streams[0].get('codec_name') in LOSSY_CODECS:
+        return 2
+    return 4 if int(streams[0].get('bits_per_sample') or 0) > 16 else 2
+
+def decoder_command(source_path):
+    """ffmpeg command decoding any input to 16- or 32-bit WAV on stdout."""
+    return [AudioSegment.converter, '-v', 'error', '-i', source_path, '-vn',
+            '-acodec', pcm_codec(source_sample_width(source_path)), '-f', 'wav', '-']
+
+def read_wav_header(stream):
+    """Parse a WAV header from a pipe; returns (channels, sample_rate, sample_width).
+    
+    Stops right at the start of the 'data' chunk, whose size is ignored
+    since ffmpeg can't know it when writing to a pipe.
+    """
+    def read_exact(size):
+        data = b''
+        while len(data) < size:
+            chunk = stream.read(size - len(data))
+            if not chunk:
+                raise ValueError("Decoder produced no audio")
+            data += chunk
+        return data
+    
+    riff, _, wave = struct.unpack('<4sI4s', read_exact(12))
+    if riff != b'RIFF' or wave != b'WAVE':
+        raise ValueError("Decoder did not produce WAV data")
+    fmt = None
+    while True:
+        chunk_id, chunk_size = struct.unpack('<4sI', read_exact(8))
+        if chunk_id == b'data':
+            break
+        body = read_exact(chunk_size + (chunk_size & 1))
+        if chunk_id == b'fmt ':
+            fmt = struct.unpack('<HHIIHH', body[:16])
+    if fmt is None:
+        raise ValueError("WAV data has no format chunk")
+    _, channels, sample_rate, _, _, bits = fmt
+    return channels, sample_rate, bits // 8
+
+def pcm_dtype(sample_width):
+    """NumPy dtype and full-scale value of little-endian PCM samples."""
+    if sample_width == 1:
+        return np.uint8, 128.0  # 8-bit WAV is unsigned
+    if sample_width == 2:
+        return np.dtype('<i2'), 32768.0
+    if sample_width == 4:
+        return np.dtype('<i4'), 2147483648.0
+    raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+
+class LoudnessMeter:
+    """Peak, RMS and integrated loudness of PCM fed in chunks.
+    
+    Power is summed per 100 ms block with vectorised NumPy operations, never
+    per sample. The integrated loudness follows the gating of ITU-R BS.1770
+    (400 ms windows with 75% overlap, -70 LUFS absolute and -10 LU relative
+    gates) but skips the K-weighting filter, which would need a per-sample
+    IIR pass, so it is an estimate that reads slightly high on bass-heavy
+    material.
+    """
+    
+    def __init__(self, sample_width, channels, frame_rate):
+        if np is None:
+            raise RuntimeError("Loudness analysis requires NumPy (pip install numpy)")
+        self.dtype, self.full_scale = pcm_dtype(sample_width)
+        self.sample_width = sample_width
+        self.block_frames = frame_rate // 10
+        self.block_samples = self.block_frames * channels
+        self.channels = channels
+        self.leftover = b''
+        self.peak = 0
+        self.sum_squares = 0.0
+        self.samples = 0
+        self.block_powers = []
+    
+    def add(self, data):
+        """Analyse the next piece of raw PCM (bytes or memoryview)."""
+        if self.leftover:
+            data = self.leftover + bytes(data)
+        usable = len(data) - len(data) % (self.block_samples * self.sample_width)
+        self.leftover = bytes(data[usable:])
+        samples = np.frombuffer(data, dtype=self.dtype, count=usable // self.sample_width)
+        step = ANALYSIS_BLOCK_SAMPLES - ANALYSIS_BLOCK_SAMPLES % self.block_samples
+        for offset in range(0, len(samples), step):
+            self.add_blocks(samples[offset:offset + step])
+    
+    def add_blocks(self, samples):
+        # Peak on the integer samples: half the memory traffic of floats
+        offset = 128 if self.dtype == np.uint8 else 0
+        self.peak = max(self.peak, int(samples.max()) - offset, offset - int(samples.min()))
+        values = samples.astype(np.float32)
+        if offset:
+            values -= offset
+        # One dot product per 100 ms block gives its sum of squares
+        blocks = values.reshape(-1, self.block_samples)
+        block_sums = np.einsum('ij,ij->i', blocks, blocks).astype(np.float64)
+        self.sum_squares += float(block_sums.sum())
+        self.samples += values.size
+        # Channel powers add up (BS.1770 weights front channels by 1)
+        self.block_powers.append(block_sums * self.channels / (self.block_samples * self.full_scale ** 2))
+    
+    def finish(self):
+        """Fold in the last partial block and return the analysis."""
+        if self.leftover:
+            tail = np.frombuffer(self.leftover, dtype=self.dtype,
+                                 count=len(self.leftover) // self.sample_width).astype(np.float32)
+            if self.dtype == np.uint8:
+                tail -= 128.0
+            if tail.size:
+                self.peak = max(self.peak, float(np.abs(tail).max()))
+                self.sum_squares += float(np.dot(tail, tail))
+                self.samples += tail.size
+            self.leftover = b''
+        return {
+            'peak_dbfs': to_db(self.peak / self.full_scale),
+            'rms_dbfs': to_db((self.sum_squares / self.samples) ** 0.5 / self.full_scale if self.samples else 0),
+            'integrated_lufs': self.integrated_loudness(),
+        }
+    
+    def block_power_array(self):
+        """Power of every complete 100 ms block so far, relative to full scale."""
+        return np.concatenate(self.block_powers) if self.block_powers else np.zeros(0)
+    
+    def integrated_loudness(self):
+        powers = self.block_power_array()
+        if len(powers) >= 4:
+            # 400 ms windows stepping by 100 ms
+            windows = np.convolve(powers, np.full(4, 0.25), mode='valid')
+        elif self.samples:
+            windows = np.array([self.sum_squares * self.channels / (self.samples * self.full_scale ** 2)])
+        else:
+            return float('-inf')
+        with np.errstate(divide='ignore'):
+            loudness = -0.691 + 10 * np.log10(windows)
+        gated = windows[loudness > -70.0]
+        if not len(gated):
+            return float('-inf')
+        relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative_gate]
+        return float(-0.691 + 10 * np.log10(gated.mean()))
+
+def to_db(ratio):
+    return 20 * math.log10(ratio) if ratio > 0 else float('-inf')
+
+def analyze_loudness(data, sample_width, channels, frame_rate):
+    """Loudness analysis of a whole buffer, e.g. AudioSegment.raw_data."""
+    meter = LoudnessMeter(sample_width, channels, frame_rate)
+    meter.add(memoryview(data))
+    return meter.finish()
+
+def normalization_gain(analysis, target_lufs, ceiling_dbfs=PEAK_CEILING_DBFS):
+    """Gain in dB that brings audio to target_lufs without peaks above the ceiling."""
+    if analysis['integrated_lufs'] == float('-inf'):
+        return 0.0  # silence: nothing to normalize
+    return min(target_lufs - analysis['integrated_lufs'], ceiling_dbfs - analysis['peak_dbfs'])
+
+def apply_gain(data, sample_width, gain_db):
+    """Return raw PCM scaled by gain_db, clipped to the sample range."""
+    dtype, full_scale = pcm_dtype(sample_width)
+    # float32 holds 16-bit samples exactly; 32-bit ones need float64
+    work = np.float64 if sample_width == 4 else np.float32
+    info = np.iinfo(dtype)
+    low, high = work(info.min), work(info.max)
+    factor = work(10 ** (gain_db / 20))
+    samples = np.frombuffer(data, dtype=dtype)
+    result = np.empty_like(samples)
+    for offset in range(0, len(samples), ANALYSIS_BLOCK_SAMPLES):
+        # In-place operations keep each block to a single temporary
+        block = samples[offset:offset + ANALYSIS_BLOCK_SAMPLES].astype(work)
+        if dtype == np.uint8:
+            block -= work(128)
+        np.multiply(block, factor, out=block)
+        if dtype == np.uint8:
+            block += work(128)
+        np.rint(block, out=block)
+        np.clip(block, low, high, out=block)
+        result[offset:offset + ANALYSIS_BLOCK_SAMPLES] = block
+    return result.tobytes()
+
+def relay_pcm(encoder, chunks):
+    """Writer thread: feed queued PCM chunks to one encoder until None arrives."""
+    broken = False
+    while True:
+        chunk = chunks.get()
+        if chunk is None:
+            break
+        if broken:
+            continue  # keep draining so the decoder loop never blocks
+        try:
+            encoder.stdin.write(chunk)
+        except BrokenPipeError:
+            broken = True  # the encoder exited early; its log is reported later
+    try:
+        encoder.stdin.close()
+    except BrokenPipeError:
+        pass
+
+def stream_fanout(source_path, outputs, process_chunk=None):
+    """Decode once and encode to several (target_path, format, bitrate) outputs.
+    
+    One ffmpeg process decodes to PCM on stdout at the source's depth
+    (16- or 32-bit, see source_sample_width); the PCM is relayed
+    in STREAM_CHUNK_BYTES pieces to one encoding ffmpeg per output, each fed
+    by its own thread and bounded queue, so the encoders run concurrently and
+    memory stays flat regardless of duration. process_chunk, if given, is
+    called with each chunk of raw PCM bytes and the sample width, and may
+    transform the chunk on the way (e.g. to apply gain).
+    Returns the decoded audio_seconds and the wall-clock seconds taken.
+    """
+    start = time.perf_counter()
+    ffmpeg = AudioSegment.converter
+    for target_path, _, _ in outputs:
+        os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+    
+    with tempfile.TemporaryFile() as decoder_log:
+        decoder = subprocess.Popen(decoder_command(source_path), stdout=subprocess.PIPE, stderr=decoder_log)
+        encoders = []
+        header_error = None
+        pcm_bytes = 0
+        try:
+            channels, sample_rate, sample_width = read_wav_header(decoder.stdout)
+        except ValueError as e:
+            header_error = e
+        try:
+            if header_error is None:
+                for target_path, target_format, bitrate in outputs:
+                    log = tempfile.TemporaryFile()
+                    encoder = subprocess.Popen(
+                        [ffmpeg, '-v', 'error', '-y', '-f', raw_pcm_format(sample_width), '-ar', str(sample_rate),
+                         '-ac', str(channels), '-i', '-']
+                        + encoder_args(target_format, bitrate, sample_width=sample_width) + [target_path],
+                        stdin=subprocess.PIPE, stderr=log)
+                    chunks = queue.Queue(maxsize=4)
+                    writer = threading.Thread(target=relay_pcm, args=(encoder, chunks), daemon=True)
+                    writer.start()
+                    encoders.append((encoder, log, chunks, writer))
+                while True:
+                    chunk = decoder.stdout.read(STREAM_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    pcm_bytes += len(chunk)
+                    if process_chunk is not None:
+                        chunk = process_chunk(chunk, sample_width)
+                    for _, _, chunks, _ in encoders:
+                        chunks.put(chunk)
+        finally:
+            for encoder, _, chunks, writer in encoders:
+                chunks.put(None)
+                writer.join()
+            decoder.stdout.close()
+            decoder_status = decoder.wait()
+            statuses = [(encoder.wait(), log) for encoder, log, _, _ in encoders]
+        
+        try:
+            # An encoder failure makes the decoder die of a broken pipe, so check encoders first
+            for status, log in statuses:
+                if status != 0:
+                    log.seek(0)
+                    raise RuntimeError(f"Encoding failed: {log.read().decode(errors='replace').strip()}")
+        finally:
+            for _, log in statuses:
+                log.close()
+        if decoder_status != 0:
+            decoder_log.seek(0)
+            raise RuntimeError(f"Decoding failed: {decoder_log.read().decode(errors='replace').strip()}")
+        if header_error is not None:
+            raise header_error
+    
+    return {
+        'audio_seconds': pcm_bytes / (sample_rate * channels * sample_width),
+        'seconds': time.perf_counter() - start,
+    }
+
+def stream_transcode(source_path, target_path, target_format, bitrate, normalize=None):
+    """Transcode one file in constant memory; see stream_normalized."""
+    return stream_normalized(source_path, [(target_path, target_format, bitrate)], normalize)
+
+def stream_normalized(source_path, outputs, normalize=None):
+    """stream_fanout, first bringing the audio to normalize LUFS if given.
+    
+    Measuring needs the whole file before any gain can be applied, so the
+    source is decoded twice: once for analysis, once for encoding.
+    """
+    if normalize is None:
+        return stream_fanout(source_path, outputs)
+    analysis = analyze_file(source_path)
+    gain = normalization_gain(analysis, normalize)
+    stats = stream_fanout(source_path, outputs, lambda chunk, sample_width: apply_gain(chunk, sample_width, gain))
+    stats['loudness'] = dict(analysis, gain_db=gain)
+    return stats
+
+def choose_split_points(powers, block_frames, total_frames, segments):
+    """Frame offsets at which to cut audio into segments, in quiet places.
+    
+    Each cut starts from an even split and moves to the quietest 100 ms
+    block (from LoudnessMeter.block_power_array) within SPLIT_SEARCH_SECONDS.
+    Returns the segment boundaries, starting at 0 and ending at total_frames.
+    """
+    sample_rate = block_frames * 10
+    segments = max(1, min(segments, total_frames // (MIN_SEGMENT_SECONDS * sample_rate)))
+    search = SPLIT_SEARCH_SECONDS * 10
+    boundaries = [0]
+    for k in range(1, segments):
+        ideal = k * len(powers) // segments
+        low = max(ideal - search, boundaries[-1] // block_frames + 1)
+        high = min(ideal + search + 1, len(powers))
+        if low >= high:
+            continue
+        quietest = low + int(np.argmin(powers[low:high]))
+        boundaries.append(quietest * block_frames + block_frames // 2)
+    boundaries.append(total_frames)
+    return boundaries
+
+def encode_pcm_range(pcm_path, start, end, channels, sample_rate, sample_width, target_path, target_format,
+                     bitrate, process_chunk=None, serial=0):
+    """Encode bytes start..end of a raw PCM file with one ffmpeg process."""
+    args = [AudioSegment.converter, '-v', 'error', '-y', '-f', raw_pcm_format(sample_width), '-ar', str(sample_rate),
+            '-ac', str(channels), '-i', '-'] + encoder_args(target_format, bitrate, sample_width=sample_width)
+    if target_format == 'ogg':
+        # Chained Ogg links need distinct stream serial numbers
+        args[-2:-2] = ['-serial_offset', str(serial)]
+    with tempfile.TemporaryFile() as log:
+        encoder = subprocess.Popen(args + [target_path], stdin=subprocess.PIPE, stderr=log)
+        try:
+            with open(pcm_path, 'rb') as f:
+                f.seek(start)
+                remaining = end - start
+                while remaining > 0:
+                    chunk = f.read(min(STREAM_CHUNK_BYTES, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    if process_chunk is not None:
+                        chunk = process_chunk(chunk)
+                    encoder.stdin.write(chunk)
+        except BrokenPipeError:
+            pass  # the encoder exited early; its log is reported below
+        finally:
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                pass
+            status = encoder.wait()
+        if status != 0:
+            log.seek(0)
+            raise RuntimeError(f"Encoding failed: {log.read().decode(errors='replace').strip()}")
+
+def split_transcode(source_path, target_path, target_format, bitrate, segments, normalize=None):
+    """Encode one long file as segments in parallel and join them gaplessly.
+    
+    The source is decoded once to a temporary PCM file while its loudness is
+    measured per 100 ms block; cuts are placed in the quietest blocks near an
+    even split, so any seam falls in silence. Each segment gets its own
+    ffmpeg encoder, all running at once, and the parts are joined by
+    chaining (target_format must be in SPLIT_FORMATS). Files too short for
+    MIN_SEGMENT_SECONDS segments are encoded as one piece.
+    """
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix='.audio_split_', dir=os.path.dirname(target_path) or '.')
+    try:
+        # Decode once, measuring as the PCM goes to disk
+        pcm_path = os.path.join(work_dir, 'source.pcm')
+        with tempfile.TemporaryFile() as decoder_log, open(pcm_path, 'wb') as pcm:
+            decoder = subprocess.Popen(decoder_command(source_path), stdout=subprocess.PIPE, stderr=decoder_log)
+            header_error = None
+            try:
+                channels, sample_rate, sample_width = read_wav_header(decoder.stdout)
+                meter = LoudnessMeter(sample_width, channels, sample_rate)
+                while True:
+                    chunk = decoder.stdout.read(STREAM_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    meter.add(chunk)
+                    pcm.write(chunk)
+            except ValueError as e:
+                header_error = e
+            finally:
+                decoder.stdout.close()
+                status = decoder.wait()
+            if status != 0:
+                decoder_log.seek(0)
+                raise RuntimeError(f"Decoding failed: {decoder_log.read().decode(errors='replace').strip()}")
+            if header_error is not None:
+                raise header_error
+        
+        analysis = meter.finish()
+        process_chunk = None
+        if normalize is not None:
+            gain = normalization_gain(analysis, normalize)
+            process_chunk = lambda chunk: apply_gain(chunk, sample_width, gain)
+        
+        frame_bytes = channels * sample_width
+        total_frames = os.path.getsize(pcm_path) // frame_bytes
+        boundaries = choose_split_points(meter.block_power_array(), meter.block_frames, total_frames, segments)
+        parts = [os.path.join(work_dir, f"part{i:04d}.{target_format}") for i in range(len(boundaries) - 1)]
+        with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+            futures = [pool.submit(encode_pcm_range, pcm_path, boundaries[i] * frame_bytes,
+                                   boundaries[i + 1] * frame_bytes, channels, sample_rate, sample_width, part,
+                                   target_format, bitrate, process_chunk, i)
+                       for i, part in enumerate(parts)]
+            for future in futures:
+                future.result()
+        
+        # Chain the links under a temporary name, then move into place
+        joined_path = os.path.join(work_dir, f"joined.{target_format}")
+        with open(joined_path, 'wb') as joined:
+            for part in parts:
+                with open(part, 'rb') as f:
+                    shutil.copyfileobj(f, joined, STREAM_CHUNK_BYTES)
+        os.replace(joined_path, target_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    stats = {
+        'audio_seconds': total_frames / sample_rate,
+        'seconds': time.perf_counter() - start,
+        'segments': len(parts),
+    }
+    if normalize is not None:
+        stats['loudness'] = dict(analysis, gain_db=gain)
+    return stats
+
+def analyze_file(source_path):
+    """Measure a file's loudness through the streaming decoder in constant memory."""
+    with tempfile.TemporaryFile() as decoder_log:
+        decoder = subprocess.Popen(decoder_command(source_path), stdout=subprocess.PIPE, stderr=decoder_log)
+        header_error = None
+        try:
+            channels, sample_rate, sample_width = read_wav_header(decoder.stdout)
+            meter = LoudnessMeter(sample_width, channels, sample_rate)
+            while True:
+                chunk = decoder.stdout.read(STREAM_CHUNK_BYTES)
+                if not chunk:
+                    break
+                meter.add(chunk)
+        except ValueError as e:
+            header_error = e
+        finally:
+            decoder.stdout.close()
+            status = decoder.wait()
+        if status != 0:
+            decoder_log.seek(0)
+            raise RuntimeError(f"Decoding failed: {decoder_log.read().decode(errors='replace').strip()}")
+        if header_error is not None:
+            raise header_error
+    return meter.finish()
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Hash a file's content in fixed-size chunks so memory stays flat."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def clone_or_copy(source, target):
+    """Give target its own copy of source's bytes: reflink, else copy.
+    
+    Never a hardlink: ffmpeg and pydub overwrite an existing output in
+    place, which would rewrite a cache entry sharing its inode. The file is
+    created under a temporary name and renamed into place, so readers never
+    see a partial file, and any link between the two names is broken. The
+    temporary name is unique to the writing process and thread, so workers
+    storing the same cache entry at once don't remove each other's copy.
+    """
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    temp_path = f"{target}.{os.getpid()}-{threading.get_ident()}.partial"
+    try:
+        if not reflink(source, temp_path):
+            shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+    finally:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+
+def reflink(source, target):
+    """Copy-on-write clone source to target where the filesystem supports it."""
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        return False
+    FICLONE = 0x40049409
+    try:
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+
+class TranscodeCache:
+    """Content-addressed store of converted files with LRU eviction.
+    
+    Entries are keyed on the source content plus every setting that affects
+    the output. Last use is tracked in each entry's access time, which is set
+    explicitly, so worker processes can share the cache without a lock.
+    Hit/miss/eviction totals are kept in stats.json for monitoring.
+    """
+    
+    STATS_NAME = 'stats.json'
+    
+    def __init__(self, folder=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.folder = folder
+        self.max_bytes = max_bytes
+    
+    def key(self, source_hash, target_format, bitrate, tags=TAGS, normalize=None):
+        """Cache key for converting content with hash_file() digest source_hash."""
+        params = json.dumps([source_hash, target_format, bitrate, tags, normalize], sort_keys=True)
+        return hashlib.blake2b(params.encode('utf-8'), digest_size=20).hexdigest()
+    
+    def entry_path(self, key, target_format):
+        return os.path.join(self.folder, key[:2], f"{key}.{target_format}")
+    
+    def fetch(self, key, target_format, target_path):
+        """Place a cached output at target_path; returns False on a miss."""
+        entry = self.entry_path(key, target_format)
+        try:
+            os.utime(entry, (time.time(), os.stat(entry).st_mtime))
+            clone_or_copy(entry, target_path)
+        except FileNotFoundError:
+            return False
+        return True
+    
+    def store(self, key, target_format, target_path):
+        """Add a freshly converted file; returns the number of entries evicted.
+        
+        Workers share the cache without a lock, so another one may evict the
+        new entry straight away; the output itself is unaffected, so that
+        only costs a miss next time.
+        """
+        entry = self.entry_path(key, target_format)
+        try:
+            clone_or_copy(target_path, entry)
+            os.utime(entry, (time.time(), os.stat(entry).st_mtime))
+        except FileNotFoundError:
+            return 0
+        return self.evict()
+    
+    def entries(self):
+        """(access time, size, path) of every cached file."""
+        result = []
+        for root, dirs, files in os.walk(self.folder):
+            for name in files:
+                if name == self.STATS_NAME or name.endswith('.partial'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                result.append((st.st_atime, st.st_size, path))
+        return result
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass  # another worker evicted it first
+            total -= size
+        return evicted
+    
+    def load_stats(self):
+        try:
+            with open(os.path.join(self.folder, self.STATS_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def record(self, hits=0, misses=0, evictions=0):
+        """Add to the persistent counters; call from a single process."""
+        stats = self.load_stats()
+        stats['hits'] = stats.get('hits', 0) + hits
+        stats['misses'] = stats.get('misses', 0) + misses
+        stats['evictions'] = stats.get('evictions', 0) + evictions
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, self.STATS_NAME)
+        with open(path + '.partial', 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+        os.replace(path + '.partial', path)
+    
+    def stats(self):
+        """Persistent counters plus the current entry count and size."""
+        entries = self.entries()
+        stats = self.load_stats()
+        stats['entries'] = len(entries)
+        stats['bytes'] = sum(size for _, size, _ in entries)
+        lookups = stats.get('hits', 0) + stats.get('misses', 0)
+        stats['hit_rate'] = stats.get('hits', 0) / lookups if lookups else 0.0
+        return stats
+
+class CacheCounts:
+    """Tallies cache results from worker stats for one run."""
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def add(self, stats):
+        self.hits += stats['hits']
+        self.misses += stats['misses']
+        self.evictions += stats['evicted']
+    
+    def record(self, cache):
+        cache.record(self.hits, self.misses, self.evictions)
+
+def format_cache_stats(stats):
+    return (f"Cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), "
+            f"{stats['entries']} entries, {stats['bytes'] / (1024 * 1024):.1f} MB, "
+            f"{stats['evictions']} evicted")
+
+def unique_targets(targets):
+    """Drop repeated (format, bitrate) targets, which would share one output path."""
+    return list(dict.fromkeys(targets))
+
+def parse_targets(text, default_bitrate="192"):
+    """Parse "mp3:320,ogg:192,flac" into [(format, bitrate), ...] without repeats."""
+    targets = []
+    for item in text.split(','):
+        item = item.strip().lower()
+        if not item:
+            continue
+        target_format, _, bitrate = item.partition(':')
+        if target_format.upper() not in FORMATS:
+            raise ValueError(f"Unknown target format: {target_format}")
+        bitrate = bitrate.strip().rstrip('k') or default_bitrate
+        if not bitrate.isdigit():
+            raise ValueError(f"Invalid bitrate for {target_format}: {bitrate}")
+        targets.append((target_format, f"{bitrate}k"))
+    if not targets:
+        raise ValueError("No targets given")
+    return unique_targets(targets)
+
+def target_outputs(base_path, targets):
+    """(target_path, format, bitrate) for each target of base_path.
+    
+    Files are named base.format; when a format is requested at several
+    bitrates, the bitrate is added to the name to keep them apart.
+    """
+    formats = [target_format for target_format, _ in targets]
+    outputs = []
+    for target_format, bitrate in targets:
+        if formats.count(target_format) > 1:
+            outputs.append((f"{base_path}_{bitrate}.{target_format}", target_format, bitrate))
+        else:
+            outputs.append((f"{base_path}.{target_format}", target_format, bitrate))
+    return outputs
+
+def convert_targets(source_path, outputs, streaming=None, cache=None, normalize=None, split=None):
+    """Convert one source to every (target_path, format, bitrate) output.
+    
+    Several outputs are produced from a single decode with their encoders
+    running side by side (stream_fanout). With a TranscodeCache, outputs
+    already in the cache are copied into place and only the rest are encoded.
+    normalize is a target loudness in LUFS, or None to keep the levels.
+    split is a number of segments to encode a single SPLIT_FORMATS output in
+    parallel (split_transcode); other outputs ignore it.
+    Returns stats with audio_seconds (0 when nothing was encoded), seconds,
+    cache hits, misses and evictions, and the loudness analysis if any.
+    """
+    start = time.perf_counter()
+    stats = {'audio_seconds': 0, 'hits': 0, 'misses': 0, 'evicted': 0}
+    pending = outputs
+    keys = {}
+    if cache is not None:
+        source_hash = hash_file(source_path)
+        pending = []
+        for target_path, target_format, bitrate in outputs:
+            keys[target_path] = cache.key(source_hash, target_format, bitrate, normalize=normalize)
+            if cache.fetch(keys[target_path], target_format, target_path):
+                stats['hits'] += 1
+            else:
+                pending.append((target_path, target_format, bitrate))
+    
+    if len(pending) == 1 and split and pending[0][1] in SPLIT_FORMATS and np is not None:
+        target_path, target_format, bitrate = pending[0]
+        result = split_transcode(source_path, target_path, target_format, bitrate, split, normalize)
+        stats['segments'] = result['segments']
+    elif len(pending) == 1:
+        target_path, target_format, bitrate = pending[0]
+        result = transcode(source_path, target_path, target_format, bitrate, streaming, normalize)
+    elif pending:
+        result = stream_normalized(source_path, pending, normalize)
+    if pending:
+        stats['audio_seconds'] = result['audio_seconds']
+        if 'loudness' in result:
+            stats['loudness'] = result['loudness']
+    
+    if cache is not None:
+        for target_path, target_format, bitrate in pending:
+            stats['evicted'] += cache.store(keys[target_path], target_format, target_path)
+            stats['misses'] += 1
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+def convert_file(source_path, target_path, target_format, bitrate, streaming=None, cache=None, normalize=None,
+                 split=None):
+    """Convert one file, serving it from cache when possible; returns stats."""
+    return convert_targets(source_path, [(target_path, target_format, bitrate)], streaming, cache, normalize,
+                           split)
+
+def transcode(source_path, target_path, target_format, bitrate, streaming=None, normalize=None):
+    """Transcode one file with pydub/ffmpeg; returns stats for throughput reports.
+    
+    streaming=None picks the streaming path for files over
+    STREAMING_THRESHOLD_BYTES; True or False forces it on or off.
+    normalize is a target loudness in LUFS, or None to keep the levels.
+    """
+    if streaming is None:
+        streaming = os.path.getsize(source_path) > STREAMING_THRESHOLD_BYTES
+    if streaming:
+        return stream_transcode(source_path, target_path, target_format, bitrate, normalize)
+    
+    start = time.perf_counter()
+    
+    # Get source format
+    source_format = os.path.splitext(source_path)[1][1:].lower()
+    
+    # Load the audio file
+    audio = AudioSegment.from_file(source_path, format=source_format)
+    
+    loudness = None
+    if normalize is not None:
+        analysis = analyze_loudness(audio.raw_data, audio.sample_width, audio.channels, audio.frame_rate)
+        gain = normalization_gain(analysis, normalize)
+        audio = AudioSegment(data=apply_gain(audio.raw_data, audio.sample_width, gain),
+                             sample_width=audio.sample_width, frame_rate=audio.frame_rate,
+                             channels=audio.channels)
+        loudness = dict(analysis, gain_db=gain)
+    
+    os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+    # Export with specified format and quality
+    audio.export(
+        target_path,
+        format=export_format(target_format),
+        bitrate=bitrate,
+        tags=TAGS
+    )
+    stats = {
+        'audio_seconds': len(audio) / 1000,
+        'seconds': time.perf_counter() - start,
+    }
+    if loudness is not None:
+        stats['loudness'] = loudness
+    return stats
+
+def scan_audio(input_folder, exclude=None):
+    """Recursively yield supported audio files under input_folder (or just it, if a file).
+    
+    The exclude folder (typically the output folder) is not descended into.
+    """
+    if os.path.isfile(input_folder):
+        yield input_folder
+        return
+    exclude = os.path.abspath(exclude) if exclude else None
+    for root, dirs, files in os.walk(input_folder):
+        dirs[:] = sorted(name for name in dirs if os.path.abspath(os.path.join(root, name)) != exclude)
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                yield os.path.join(root, name)
+
+def convert_folder(input_folder, output_folder, targets, workers=None, streaming=None, cache=None,
+                   normalize=None, split=None):
+    """Convert every audio file under input_folder on a process pool.
+    
+    targets is a list of (format, bitrate); each source is decoded once for
+    all of them. The output tree mirrors the input tree; input_folder may
+    also be a single file. Yields (source_path, target_paths, stats, error)
+    in completion order; error is None on success.
+    
+    Every file converting at once may be split, so split is capped at
+    cpu_count divided by the number of files running at once, keeping the
+    encoders near the core count; a single file may use every core.
+    """
+    source_paths = list(scan_audio(input_folder, exclude=output_folder))
+    running = max(1, min(workers or os.cpu_count() or 1, len(source_paths)))
+    if split:
+        split = min(split, (os.cpu_count() or 1) // running)
+        if split < 2:
+            split = None  # one segment per file: plain transcoding is cheaper
+    base_folder = os.path.dirname(input_folder) if os.path.isfile(input_folder) else input_folder
+    with ProcessPoolExecutor(max_workers=running) as pool:
+        futures = {}
+        for source_path in source_paths:
+            relative = os.path.splitext(os.path.relpath(source_path, base_folder))[0]
+            outputs = target_outputs(os.path.join(output_folder, relative), targets)
+            future = pool.submit(convert_targets, source_path, outputs, streaming, cache, normalize, split)
+            futures[future] = (source_path, [target_path for target_path, _, _ in outputs])
+        
+        for future in as_completed(futures):
+            source_path, target_paths = futures[future]
+            error = future.exception()
+            yield source_path, target_paths, future.result() if error is None else None, error
+
+def format_loudness(loudness):
+    return (f"{loudness['integrated_lufs']:.1f} LUFS, peak {loudness['peak_dbfs']:.1f} dBFS, "
+            f"gain {loudness['gain_db']:+.1f} dB")
+
+def format_throughput(audio_seconds, wall_seconds):
+    """Aggregate throughput in audio-hours converted per wall-clock minute."""
+    if not wall_seconds:
+        return "0.00 audio-hours/min"
+    return f"{audio_seconds / 3600 / (wall_seconds / 60):.2f} audio-hours/min"
 
 class AudioConverter:
     def __init__(self, root):
@@ -12,6 +933,9 @@ class AudioConverter:
         self.source_path = tk.StringVar()
         self.target_format = tk.StringVar(value="MP3")
         
+        # Folder conversion reports back through a queue polled by Tk
+        self.results = queue.Queue()
+        
         # Create main frame
         main_frame = ttk.Frame(root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -23,9 +947,8 @@ class AudioConverter:
         
         # Target format selection
         ttk.Label(main_frame, text="Convert to:").grid(row=1, column=0, sticky=tk.W)
-        formats = ["MP3", "WAV", "OGG", "FLAC", "M4A"]
         format_combo = ttk.Combobox(main_frame, textvariable=self.target_format, 
-                                  values=formats, state="readonly")
+                                  values=FORMATS, state="readonly")
         format_combo.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
         
         # Quality frame
@@ -39,14 +962,58 @@ class AudioConverter:
         ttk.Combobox(quality_frame, textvariable=self.bitrate_var, values=bitrates, 
                     state="readonly", width=10).grid(row=0, column=1, padx=5)
         
-        # Convert button
-        ttk.Button(main_frame, text="Convert Audio", command=self.convert_audio).grid(
-            row=3, column=0, columnspan=3, pady=10)
+        # Worker processes for folder conversion
+        self.workers_var = tk.StringVar(value=str(os.cpu_count() or 1))
+        ttk.Label(quality_frame, text="Workers:").grid(row=0, column=2, padx=5)
+        ttk.Spinbox(quality_frame, from_=1, to=256, textvariable=self.workers_var, width=5).grid(
+            row=0, column=3, padx=5)
+        
+        # Streaming keeps memory flat; large files stream automatically
+        self.stream_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(quality_frame, text="Always stream (constant memory)",
+                        variable=self.stream_var).grid(row=1, column=0, columnspan=4, sticky=tk.W, padx=5)
+        
+        # Repeat conversions of the same master are served from the cache
+        self.cache_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(quality_frame, text="Use transcode cache",
+                        variable=self.cache_var).grid(row=2, column=0, columnspan=4, sticky=tk.W, padx=5)
+        
+        # Extra formats are encoded from the same decode as the main one
+        self.extra_targets_var = tk.StringVar()
+        ttk.Label(quality_frame, text="Also produce:").grid(row=3, column=0, padx=5, sticky=tk.W)
+        ttk.Entry(quality_frame, textvariable=self.extra_targets_var, width=25).grid(
+            row=3, column=1, columnspan=3, padx=5, sticky=tk.W)
+        ttk.Label(quality_frame, text="e.g. ogg:192, flac").grid(row=4, column=1, columnspan=3, padx=5, sticky=tk.W)
+        
+        # Loudness normalization before export
+        self.normalize_var = tk.BooleanVar(value=False)
+        self.target_lufs_var = tk.StringVar(value=str(DEFAULT_TARGET_LUFS))
+        ttk.Checkbutton(quality_frame, text="Normalize loudness to (LUFS):",
+                        variable=self.normalize_var).grid(row=5, column=0, columnspan=2, sticky=tk.W, padx=5)
+        ttk.Entry(quality_frame, textvariable=self.target_lufs_var, width=8).grid(row=5, column=2, padx=5, sticky=tk.W)
+        
+        # Long single files can be encoded as segments across the workers
+        self.split_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(quality_frame, text=f"Split long files across workers ({', '.join(SPLIT_FORMATS).upper()})",
+                        variable=self.split_var).grid(row=6, column=0, columnspan=4, sticky=tk.W, padx=5)
+        
+        # Convert buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=3, column=0, columnspan=3, pady=10)
+        ttk.Button(button_frame, text="Convert Audio", command=self.convert_audio).grid(row=0, column=0, padx=5)
+        self.folder_btn = ttk.Button(button_frame, text="Convert Folder...", command=self.convert_folder)
+        self.folder_btn.grid(row=0, column=1, padx=5)
         
         # Status label
         self.status_var = tk.StringVar()
         status_label = ttk.Label(main_frame, textvariable=self.status_var, wraplength=300)
         status_label.grid(row=4, column=0, columnspan=3, pady=5)
+        
+        # Per-file results of folder conversion
+        self.file_list = tk.Listbox(main_frame, height=8, width=60)
+        self.file_list.grid(row=5, column=0, columnspan=3, pady=5, sticky=(tk.W, tk.E))
+        
+        self.root.after(POLL_INTERVAL_MS, self.poll_results)
 
     def browse_file(self):
         filetypes = (
@@ -67,30 +1034,27 @@ class AudioConverter:
                 messagebox.showerror("Error", "Please select a source audio file")
                 return
 
-            # Get source format
-            source_format = os.path.splitext(source_path)[1][1:].lower()
-            
-            # Load the audio file
-            audio = AudioSegment.from_file(source_path, format=source_format)
-            
             # Get target settings
-            target_format = self.target_format.get().lower()
-            bitrate = f"{self.bitrate_var.get()}k"
+            targets = self.targets()
             
-            # Create target path
+            # Create target paths
             directory = os.path.dirname(source_path)
             filename = os.path.splitext(os.path.basename(source_path))[0]
-            target_path = os.path.join(directory, f"{filename}_converted.{target_format}")
+            outputs = target_outputs(os.path.join(directory, f"{filename}_converted"), targets)
             
-            # Export with specified format and quality
-            audio.export(
-                target_path,
-                format=target_format,
-                bitrate=bitrate,
-                tags={'converted_by': 'Audio Converter'}
-            )
+            cache = self.cache()
+            stats = convert_targets(source_path, outputs, self.streaming(), cache, self.normalize(), self.split())
             
-            self.status_var.set(f"Successfully converted!\nSaved as: {target_path}")
+            saved = "\n".join(target_path for target_path, _, _ in outputs)
+            status = f"Successfully converted!\nSaved as: {saved}"
+            if 'segments' in stats:
+                status += f"\nEncoded as {stats['segments']} segments"
+            if 'loudness' in stats:
+                status += f"\nLoudness: {format_loudness(stats['loudness'])}"
+            if cache is not None:
+                cache.record(stats['hits'], stats['misses'], stats['evicted'])
+                status += f"\n{format_cache_stats(cache.stats())}"
+            self.status_var.set(status)
             
             if messagebox.askyesno("Success", "Would you like to open the containing folder?"):
                 os.startfile(directory)
@@ -99,7 +1063,187 @@ class AudioConverter:
             self.status_var.set(f"Error: {str(e)}")
             messagebox.showerror("Error", f"Conversion failed: {str(e)}")
 
+    def streaming(self):
+        """True to force streaming, None to let file size decide."""
+        return True if self.stream_var.get() else None
+
+    def cache(self):
+        return TranscodeCache() if self.cache_var.get() else None
+
+    def split(self):
+        """Segments per long file (one per worker), or None; raises ValueError."""
+        if not self.split_var.get():
+            return None
+        workers = int(self.workers_var.get())
+        if workers <= 0:
+            raise ValueError("Workers must be a positive number")
+        return workers
+
+    def normalize(self):
+        """Target loudness in LUFS, or None when normalization is off; raises ValueError."""
+        if not self.normalize_var.get():
+            return None
+        try:
+            return float(self.target_lufs_var.get())
+        except ValueError:
+            raise ValueError("Target loudness must be a number, e.g. -16")
+
+    def targets(self):
+        """The selected format and bitrate plus any extra targets; raises ValueError."""
+        bitrate = self.bitrate_var.get()
+        targets = [(self.target_format.get().lower(), f"{bitrate}k")]
+        if self.extra_targets_var.get().strip():
+            targets += parse_targets(self.extra_targets_var.get(), bitrate)
+        return unique_targets(targets)
+
+    def convert_folder(self):
+        input_folder = filedialog.askdirectory(title="Select Input Folder")
+        if not input_folder:
+            return
+        output_folder = filedialog.askdirectory(title="Select Output Folder")
+        if not output_folder:
+            return
+        try:
+            workers = int(self.workers_var.get())
+            if workers <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Workers must be a positive number")
+            return
+        try:
+            targets = self.targets()
+            normalize = self.normalize()
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        self.folder_btn.state(['disabled'])
+        self.file_list.delete(0, tk.END)
+        self.status_var.set("Converting folder...")
+        
+        thread = threading.Thread(target=self.run_folder,
+                                  args=(input_folder, output_folder, targets, workers,
+                                        self.streaming(), self.cache(), normalize, self.split()),
+                                  daemon=True)
+        thread.start()
+
+    def run_folder(self, input_folder, output_folder, targets, workers, streaming, cache, normalize, split):
+        """Worker thread: never touches Tk, only posts to the results queue."""
+        start = time.perf_counter()
+        audio_seconds = 0
+        converted = 0
+        failed = 0
+        counts = CacheCounts()
+        try:
+            for source_path, target_paths, stats, error in convert_folder(
+                    input_folder, output_folder, targets, workers, streaming, cache, normalize, split):
+                name = os.path.relpath(source_path, input_folder)
+                if error is None:
+                    converted += 1
+                    audio_seconds += stats['audio_seconds']
+                    counts.add(stats)
+                    hit = f" ({stats['hits']} cached)" if stats['hits'] else ""
+                    if 'segments' in stats:
+                        hit += f" ({stats['segments']} segments)"
+                    if 'loudness' in stats:
+                        hit += f" [{format_loudness(stats['loudness'])}]"
+                    self.results.put(('file', f"OK     {name} ({stats['seconds']:.1f}s){hit}"))
+                else:
+                    failed += 1
+                    self.results.put(('file', f"ERROR  {name}: {str(error)}"))
+                throughput = format_throughput(audio_seconds, time.perf_counter() - start)
+                self.results.put(('status', f"Converted {converted}, failed {failed} - {throughput}"))
+        except Exception as e:
+            self.results.put(('file', f"ERROR  {str(e)}"))
+        throughput = format_throughput(audio_seconds, time.perf_counter() - start)
+        summary = (f"Folder conversion complete!\nConverted {converted} files, "
+                   f"{failed} failed.\nThroughput: {throughput}")
+        if cache is not None:
+            counts.record(cache)
+            summary += f"\n{format_cache_stats(cache.stats())}"
+        self.results.put(('done', summary))
+
+    def poll_results(self):
+        """Apply queued folder-conversion results; runs on the Tk thread."""
+        while True:
+            try:
+                kind, text = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'file':
+                self.file_list.insert(tk.END, text)
+                self.file_list.see(tk.END)
+            elif kind == 'status':
+                self.status_var.set(text)
+            elif kind == 'done':
+                self.folder_btn.state(['!disabled'])
+                self.status_var.set(text)
+                messagebox.showinfo("Success", text)
+        self.root.after(POLL_INTERVAL_MS, self.poll_results)
+
+def run_batch(args):
+    """Headless folder conversion with per-file status lines."""
+    cache = TranscodeCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache else None
+    start = time.perf_counter()
+    audio_seconds = 0
+    failed = 0
+    counts = CacheCounts()
+    for source_path, target_paths, stats, error in convert_folder(
+            args.input, args.output, args.targets, args.workers, args.stream, cache, args.normalize, args.split):
+        if error is None:
+            audio_seconds += stats['audio_seconds']
+            counts.add(stats)
+            hit = f" ({stats['hits']} cached)" if stats['hits'] else ""
+            if 'segments' in stats:
+                hit += f" ({stats['segments']} segments)"
+            if 'loudness' in stats:
+                hit += f" [{format_loudness(stats['loudness'])}]"
+            print(f"OK     {source_path} -> {', '.join(target_paths)} ({stats['seconds']:.1f}s){hit}")
+        else:
+            failed += 1
+            print(f"ERROR  {source_path}: {str(error)}")
+    print(f"Throughput: {format_throughput(audio_seconds, time.perf_counter() - start)}")
+    if cache is not None:
+        counts.record(cache)
+        print(format_cache_stats(cache.stats()))
+    return 1 if failed else 0
+
 def main():
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="Audio Format Converter - batch convert a folder")
+        parser.add_argument("input", help="Audio file, or folder of audio files (searched recursively)")
+        parser.add_argument("output", help="Output folder; the input tree is mirrored")
+        parser.add_argument("-f", "--format", default="mp3", choices=[f.lower() for f in FORMATS],
+                            help="Target format (default: mp3)")
+        parser.add_argument("-b", "--bitrate", default="192", help="Bitrate in kbps (default: 192)")
+        parser.add_argument("-t", "--targets",
+                            help="Several outputs from one decode, e.g. mp3:320,ogg:192,flac (overrides -f)")
+        parser.add_argument("-w", "--workers", type=int, default=None,
+                            help="Worker processes (default: core count)")
+        parser.add_argument("--stream", action="store_const", const=True, default=None,
+                            help="Stream every file through ffmpeg in constant memory "
+                                 f"(default: only files over {STREAMING_THRESHOLD_BYTES // (1024 * 1024)} MB)")
+        parser.add_argument("--normalize", type=float, nargs='?', const=DEFAULT_TARGET_LUFS, metavar="LUFS",
+                            help=f"Normalize loudness before export (default target: {DEFAULT_TARGET_LUFS} LUFS, "
+                                 f"peaks kept below {PEAK_CEILING_DBFS} dBFS)")
+        parser.add_argument("--split", type=int, nargs='?', const=os.cpu_count() or 1, metavar="N",
+                            help="Encode long files as up to N segments in parallel, cut at silences "
+                                 f"(default: core count; {', '.join(SPLIT_FORMATS)} only, "
+                                 "other formats use one encoder)")
+        parser.add_argument("--cache", action="store_true", help="Serve repeat conversions from the transcode cache")
+        parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"Cache folder (default: {DEFAULT_CACHE_DIR})")
+        parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_MB,
+                            help=f"Cache size cap in MB (default: {DEFAULT_CACHE_MB})")
+        args = parser.parse_args()
+        try:
+            args.targets = (parse_targets(args.targets, args.bitrate) if args.targets
+                            else [(args.format, f"{args.bitrate}k")])
+        except ValueError as e:
+            parser.error(str(e))
+        if args.normalize is not None and np is None:
+            parser.error("--normalize requires NumPy (pip install numpy)")
+        sys.exit(run_batch(args))
+    
     root = tk.Tk()
     app = AudioConverter(root)
     root.mainloop()
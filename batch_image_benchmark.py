@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import random
+import shutil
+import tempfile
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw
+from batch_image_converter import (
+    convert_batch, output_base_for, scan_images, parse_renditions,
+    DOWNSCALE_MODES, ENCODER_PROFILES, DEFAULT_PROFILE, DEFAULT_IO_WORKERS,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# (width, height, weight) of the synthetic image sizes
+CORPUS_SIZES = [
+    (320, 240, 4),
+    (1600, 1200, 4),
+    (4000, 3000, 2),
+    (6000, 4000, 1),
+]
+
+# (mode, extension, weight) of the synthetic image types
+CORPUS_TYPES = [
+    ('RGB', 'jpg', 5),
+    ('RGBA', 'png', 2),
+    ('P', 'png', 1),
+    ('P', 'gif', 1),
+    ('RGB', 'webp', 1),
+    ('RGB', 'bmp', 1),
+]
+
+def weighted_choice(rng, options):
+    return rng.choices(options, weights=[o[-1] for o in options])[0][:-1]
+
+def generate_image(rng, width, height, mode):
+    """Draw a reproducible image: a gradient, random shapes and fine noise."""
+    img = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(1, width // 2 + 2), y0 + rng.randrange(1, height // 2 + 2)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+        else:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+
+    # Low-resolution noise scaled up gives photo-like texture cheaply
+    noise_size = (max(1, width // 8), max(1, height // 8))
+    noise = Image.frombytes('L', noise_size, rng.randbytes(noise_size[0] * noise_size[1]))
+    noise = noise.resize((width, height), Image.Resampling.BILINEAR).convert('RGB')
+    img = Image.blend(img, noise, 0.25)
+
+    if mode == 'RGBA':
+        alpha = Image.linear_gradient('L').rotate(90).resize((width, height))
+        img.putalpha(alpha)
+    elif mode == 'P':
+        img = img.quantize(256)
+    return img
+
+def generate_corpus(folder, count, seed=0):
+    """Write count reproducible images to folder; returns the file paths."""
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(count):
+        # One generator per image, so existing files can be skipped
+        rng = random.Random(f"{seed}-{i}")
+        width, height = weighted_choice(rng, CORPUS_SIZES)
+        mode, extension = weighted_choice(rng, CORPUS_TYPES)
+        path = os.path.join(folder, f"img_{i:05d}_{mode}.{extension}")
+        if not os.path.exists(path):
+            generate_image(rng, width, height, mode).save(path)
+        paths.append(path)
+    return paths
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its largest child, in MB."""
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+def run_benchmark(corpus_folder, settings, workers=None, memory_budget=None, io_workers=DEFAULT_IO_WORKERS):
+    """Convert the corpus headlessly into a temporary folder and measure it.
+
+    Peak RSS covers the whole calling process, so call this in a fresh one.
+    """
+    output_folder = tempfile.mkdtemp(prefix='image_bench_')
+    try:
+        jobs = [(path, output_base_for(path, corpus_folder, output_folder))
+                for path in scan_images(corpus_folder)]
+        images = 0
+        errors = 0
+        megapixels = 0.0
+        encode_seconds = {}
+        start = time.perf_counter()
+        results = convert_batch(jobs, settings, workers, memory_budget, io_workers=io_workers)
+        for source_path, output_base, stats, error in results:
+            if error is not None:
+                print(f"Error converting {source_path}: {str(error)}")
+                errors += 1
+                continue
+            images += 1
+            megapixels += stats['native_pixels'] / 1e6
+            for save_format, seconds in stats['encode_seconds'].items():
+                encode_seconds[save_format] = encode_seconds.get(save_format, 0) + seconds
+        wall = time.perf_counter() - start
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+
+    own_rss, child_rss = peak_rss_mb()
+    return {
+        'settings': settings,
+        'workers': workers or os.cpu_count(),
+        'io_workers': io_workers,
+        'images': images,
+        'errors': errors,
+        'megapixels': megapixels,
+        'wall_seconds': wall,
+        'images_per_second': images / wall if wall else 0,
+        'megapixels_per_second': megapixels / wall if wall else 0,
+        'peak_rss_mb': own_rss,
+        'peak_child_rss_mb': child_rss,
+        'encode_seconds': encode_seconds,
+    }
+
+def compare_to_baseline(result, baseline, tolerance=0.10):
+    """Return a list of regressions of result against a stored baseline run."""
+    regressions = []
+    for key in ('images_per_second', 'megapixels_per_second'):
+        if baseline.get(key) and result[key] < baseline[key] * (1 - tolerance):
+            regressions.append(f"{key}: {result[key]:.2f} < baseline {baseline[key]:.2f}")
+    for key in ('peak_rss_mb', 'peak_child_rss_mb'):
+        if baseline.get(key) and result[key] and result[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key}: {result[key]:.1f} > baseline {baseline[key]:.1f}")
+    for save_format, seconds in result['encode_seconds'].items():
+        base_seconds = baseline.get('encode_seconds', {}).get(save_format)
+        if base_seconds and seconds > base_seconds * (1 + tolerance):
+            regressions.append(f"encode_seconds[{save_format}]: {seconds:.2f} > baseline {base_seconds:.2f}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark batch_image_converter on a reproducible synthetic corpus"
+    )
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), 'image_bench_corpus'),
+                        help="Folder for the generated corpus (reused if present)")
+    parser.add_argument("--count", type=int, default=60, help="Number of images to generate (default: 60)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed (default: 0)")
+    parser.add_argument("--format", default="jpg", choices=["jpg", "png", "webp"], help="Target format")
+    parser.add_argument("--width", type=int, default=800, help="Target width (default: 800)")
+    parser.add_argument("--height", type=int, default=600, help="Target height (default: 600)")
+    parser.add_argument("--renditions", default="", help="Renditions, e.g. thumb:200x150:webp:80,large:1600x1200:jpg")
+    parser.add_argument("--downscale", default="off", choices=list(DOWNSCALE_MODES), help="Fast downscale mode")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=list(ENCODER_PROFILES), help="Encoder profile")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: core count)")
+    parser.add_argument("--io-workers", type=int, default=DEFAULT_IO_WORKERS,
+                        help=f"Write threads, 0 to write in workers (default: {DEFAULT_IO_WORKERS})")
+    parser.add_argument("--memory-budget", type=int, default=None, help="RAM budget in MB")
+    parser.add_argument("--output", help="Write the result JSON to this file")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON; exit 1 on regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the --baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression fraction (default: 0.10)")
+    args = parser.parse_args()
+
+    corpus_folder = os.path.join(args.corpus, f"seed{args.seed}")
+    # Generate and measure in separate processes: a child's peak RSS starts
+    # from its parent's, which would otherwise depend on whether the corpus
+    # had to be drawn
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(generate_corpus, corpus_folder, args.count, args.seed).result()
+    settings = {
+        'format': args.format,
+        'width': args.width,
+        'height': args.height,
+        'downscale': args.downscale,
+        'renditions': parse_renditions(args.renditions),
+        'profile': args.profile,
+    }
+    memory_budget = args.memory_budget * 1024 * 1024 if args.memory_budget else None
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        result = pool.submit(run_benchmark, corpus_folder, settings, args.workers, memory_budget,
+                             args.io_workers).result()
+    result['corpus'] = {'count': args.count, 'seed': args.seed}
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+
+    if args.baseline:
+        if args.save_baseline:
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                f.write(output)
+            print(f"Baseline saved to {args.baseline}")
+        else:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('settings') != result['settings'] or baseline.get('corpus') != result['corpus']:
+                print("Warning: baseline was recorded with different settings or corpus.")
+            regressions = compare_to_baseline(result, baseline, args.tolerance)
+            if regressions:
+                print("Regressions against baseline:")
+                for line in regressions:
+                    print(f"  {line}")
+                sys.exit(1)
+            print("No regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,978 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image
+from io import BytesIO
+from png_optimizer import optimize_lossless
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import os
 import sys
+import json
+import math
+import shutil
+import hashlib
+import queue
 import threading
+import time
+
+# Supported input formats
+SUPPORTED_FORMATS = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tif', '.tiff']
+
+# Manifest kept in the output folder for incremental re-runs
+MANIFEST_NAME = '.conversion_manifest.json'
+
+# Append-only log of completed sources, folded into the manifest on save
+JOURNAL_NAME = '.conversion_journal.jsonl'
+
+# Suffix of outputs that are still being written
+PARTIAL_SUFFIX = '.partial'
+
+# Per-file stage timings, appended as JSON lines when tracing is on
+TRACE_NAME = 'conversion_trace.jsonl'
+
+# Fast-downscale modes: how many times larger than the target the image is kept
+# before the final LANCZOS pass. Bigger gaps look better, smaller ones are faster.
+DOWNSCALE_MODES = {
+    'off': None,
+    'quality': 3.0,
+    'balanced': 2.0,
+    'fast': 1.0,
+}
+
+# How often the UI drains worker progress events, in milliseconds
+PROGRESS_INTERVAL_MS = 100
+
+# Threads writing encoded outputs to disk, overlapping encode and write
+DEFAULT_IO_WORKERS = 4
+
+# Default RAM budget for images being decoded at once, in megabytes
+DEFAULT_MEMORY_BUDGET_MB = 4096
+
+# Rows decoded at a time on the strip-wise path for oversized images
+STRIP_ROWS = 256
+
+# Bytes per pixel of raw pixel layouts that can be split into row bands
+RAW_BYTES_PER_PIXEL = {
+    'L': 1, 'P': 1, 'LA': 2, 'I;16': 2, 'I;16B': 2,
+    'RGB': 3, 'BGR': 3, 'RGBA': 4, 'RGBX': 4, 'BGRA': 4, 'BGRX': 4, 'CMYK': 4,
+}
+
+# A rendition is resampled from the previous (larger) one only when that one
+# is at least this many times the target size; otherwise from the source.
+LADDER_GAP = 2.0
+
+# Encoder effort profiles: per-format Pillow save parameters, from the
+# cheapest encode to the smallest output
+ENCODER_PROFILES = {
+    'fast': {
+        'JPEG': {},
+        'PNG': {'compress_level': 1},
+        'WEBP': {'method': 2},
+    },
+    'balanced': {
+        'JPEG': {'optimize': True},
+        'PNG': {'compress_level': 6},
+        'WEBP': {'method': 4},
+    },
+    'max-compression': {
+        'JPEG': {'optimize': True, 'progressive': True},
+        'PNG': {'optimize': True},
+        'WEBP': {'method': 6},
+    },
+}
+DEFAULT_PROFILE = 'max-compression'
+
+def get_save_options(target_format, quality=None, profile=DEFAULT_PROFILE):
+    """Return the Pillow format name and save kwargs for a target extension."""
+    save_format = 'JPEG' if target_format.lower() in ['jpg', 'jpeg'] else target_format.upper()
+    save_kwargs = {}
+    
+    if save_format in ('JPEG', 'WEBP'):
+        save_kwargs['quality'] = quality or 95
+    save_kwargs.update(ENCODER_PROFILES[profile].get(save_format, {}))
+    return save_format, save_kwargs
+
+def parse_renditions(text):
+    """Parse 'name:WIDTHxHEIGHT:format[:quality]' entries separated by commas.
+    
+    Raises ValueError on malformed entries. An empty string yields [].
+    """
+    renditions = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        parts = item.split(':')
+        if len(parts) not in (3, 4):
+            raise ValueError(f"Invalid rendition: {item}")
+        name, size, target_format = parts[0].strip(), parts[1].strip(), parts[2].strip().lower()
+        width, height = (int(v) for v in size.lower().split('x'))
+        quality = int(parts[3]) if len(parts) == 4 else None
+        if not name or width <= 0 or height <= 0 or target_format not in ('jpg', 'jpeg', 'png', 'webp'):
+            raise ValueError(f"Invalid rendition: {item}")
+        if quality is not None and not 1 <= quality <= 100:
+            raise ValueError(f"Invalid quality in rendition: {item}")
+        renditions.append({'name': name, 'width': width, 'height': height,
+                           'format': target_format, 'quality': quality})
+    return renditions
+
+def get_renditions(settings):
+    """Return the renditions for a job, largest first.
+    
+    Without an explicit 'renditions' list the job has a single unnamed
+    rendition built from the format/width/height settings.
+    """
+    renditions = settings.get('renditions') or [{
+        'name': None,
+        'width': settings['width'],
+        'height': settings['height'],
+        'format': settings['format'],
+        'quality': None,
+    }]
+    return sorted(renditions, key=lambda r: r['width'] * r['height'], reverse=True)
+
+def rendition_paths(output_base, settings):
+    """Output paths for every rendition of a source, in get_renditions order."""
+    paths = []
+    for rendition in get_renditions(settings):
+        suffix = f"_{rendition['name']}" if rendition['name'] else ""
+        paths.append(f"{output_base}{suffix}.{rendition['format']}")
+    return paths
+
+def to_8bit_mode(img):
+    """Convert decoded modes that LANCZOS or the PNG/WEBP encoders reject.
+    
+    TIFF scans are often 16-bit grayscale, scaled here to 8 bits rather
+    than clipped, or CMYK, which PNG can't store.
+    """
+    if img.mode.startswith('I;16'):
+        img = img.convert('I')
+    if img.mode in ('I', 'F'):
+        return img.point(lambda value: value / 256).convert('L')
+    if img.mode == 'CMYK':
+        return img.convert('RGB')
+    return img
+
+def fast_downscale(img, width, height, reducing_gap):
+    """Shrink an opened image cheaply before the final resample.
+    
+    JPEGs are decoded at a reduced DCT scale via draft(), then an integer
+    reduce() brings the image down to roughly reducing_gap times the target.
+    Returns the image and the number of pixels actually decoded.
+    """
+    keep_width = int(width * reducing_gap)
+    keep_height = int(height * reducing_gap)
+    
+    if img.format == 'JPEG':
+        img.draft(img.mode, (keep_width, keep_height))
+    decoded_pixels = img.width * img.height
+    
+    factor = min(img.width // keep_width, img.height // keep_height)
+    if factor >= 2 and img.mode not in ('1', 'P'):
+        # reduce() has no 16-bit path, so such scans are brought to 8 bits first
+        img = to_8bit_mode(img).reduce(factor)
+    return img, decoded_pixels
+
+def estimate_decoded_bytes(source_path):
+    """Estimate peak memory for decoding an image from its header alone.
+    
+    Image.open only parses the header, so this is cheap. Pillow stores most
+    modes at 4 bytes per pixel; the estimate is doubled to cover the mode
+    conversion and resize copies made while converting.
+    """
+    with Image.open(source_path) as img:
+        if img.mode in ('1', 'L', 'P'):
+            bytes_per_pixel = 1
+        elif img.mode.startswith('I;16'):
+            bytes_per_pixel = 2
+        else:
+            bytes_per_pixel = 4
+        return img.width * img.height * bytes_per_pixel * 2
+
+def split_raw_tile(tile, top, bottom):
+    """Return the part of an uncompressed tile covering image rows [top, bottom)."""
+    codec, (x0, y0, x1, y1), offset, args = tile
+    rawmode, stride, orientation = args if isinstance(args, tuple) else (args, 0, 1)
+    if not stride:
+        stride = (x1 - x0) * RAW_BYTES_PER_PIXEL[rawmode]
+    first, last = max(top, y0), min(bottom, y1)
+    if orientation < 0:
+        # Bottom-up storage: the lowest rows come first in the file
+        offset += (y1 - last) * stride
+    else:
+        offset += (first - y0) * stride
+    return (codec, (x0, first, x1, last), offset, (rawmode, stride, orientation))
+
+def plan_strips(tiles, height, factor):
+    """Split an image's tile list into row bands that can be decoded one by one.
+    
+    Uncompressed tiles are cut at band boundaries; compressed tiles (TIFF
+    strips or tiles) must fit within a band. Bands are a multiple of factor
+    rows so each reduces independently. Returns [(top, bottom, tiles)] with
+    tile extents relative to the band, or None if the layout can't be split.
+    """
+    tile_rows = {t[1][3] - t[1][1] for t in tiles if t[0] != 'raw'}
+    step = factor
+    for rows in tile_rows:
+        step = step * rows // math.gcd(step, rows)
+    band_rows = step * max(1, STRIP_ROWS // step)
+    
+    bands = []
+    for top in range(0, height, band_rows):
+        bottom = min(top + band_rows, height)
+        band_tiles = []
+        for tile in tiles:
+            codec, (x0, y0, x1, y1), offset, args = tile
+            if y1 <= top or y0 >= bottom:
+                continue
+            if codec == 'raw' and (y0 < top or y1 > bottom):
+                rawmode = args[0] if isinstance(args, tuple) else args
+                if rawmode not in RAW_BYTES_PER_PIXEL:
+                    return None
+                tile = split_raw_tile(tile, top, bottom)
+            elif y0 < top or y1 > bottom:
+                return None
+            codec, (x0, y0, x1, y1), offset, args = tile
+            band_tiles.append((codec, (x0, y0 - top, x1, y1 - top), offset, args))
+        bands.append((top, bottom, band_tiles))
+    return bands
+
+def load_reduced_by_strips(source_path, width, height, reducing_gap):
+    """Decode an oversized image band by band, reducing each band as it loads.
+    
+    Only one band of full-resolution pixels is held at a time. Returns the
+    reduced image, or None when the file's layout can't be decoded in bands.
+    """
+    with Image.open(source_path) as img:
+        tiles = list(img.tile)
+        mode = img.mode
+        full_width, full_height = img.size
+    
+    factor = min(full_width // int(width * reducing_gap), full_height // int(height * reducing_gap))
+    if factor < 2 or mode in ('1', 'P'):
+        return None
+    bands = plan_strips(tiles, full_height, factor)
+    if bands is None or len(bands) < 2:
+        return None
+    
+    reduced = None
+    for top, bottom, band_tiles in bands:
+        with Image.open(source_path) as band:
+            # Point the lazy decoder at just this band's tiles
+            band._size = (full_width, bottom - top)
+            band.tile = band_tiles
+            band.load()
+            part = to_8bit_mode(band).reduce(factor)
+        if reduced is None:
+            reduced = Image.new(part.mode, (math.ceil(full_width / factor), math.ceil(full_height / factor)))
+        reduced.paste(part, (0, top // factor))
+    return reduced
+
+def write_atomic(path, data):
+    """Write data under a temporary name, then rename it into place.
+    
+    A cancelled or crashed run leaves at most a stale .partial file, never
+    a truncated output under the real name.
+    """
+    temp_path = path + PARTIAL_SUFFIX
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def link_or_copy(source, target):
+    """Make target share source's bytes: hardlink, else reflink, else copy.
+    
+    The link is created under a temporary name and renamed into place.
+    """
+    temp_path = target + PARTIAL_SUFFIX
+    if os.path.lexists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        if not reflink(source, temp_path):
+            shutil.copyfile(source, temp_path)
+    os.replace(temp_path, target)
+
+def reflink(source, target):
+    """Copy-on-write clone source to target where the filesystem supports it."""
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        return False
+    FICLONE = 0x40049409
+    try:
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Hash a file's content in fixed-size chunks so memory stays flat."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def write_outputs(encoded):
+    """Store encoded (path, bytes) outputs; returns the seconds spent writing."""
+    start = time.perf_counter()
+    for path, data in encoded:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        write_atomic(path, data)
+    return time.perf_counter() - start
+
+class StageClock:
+    """Accumulates wall time per pipeline stage with one perf_counter call per lap."""
+    
+    def __init__(self):
+        self.stages = {}
+        self.last = time.perf_counter()
+    
+    def lap(self, stage):
+        now = time.perf_counter()
+        elapsed = now - self.last
+        self.stages[stage] = self.stages.get(stage, 0) + elapsed
+        self.last = now
+        return elapsed
+
+def convert_one(source_path, output_base, settings, low_memory=False, write=True):
+    """Decode a source once and write each rendition. Runs inside a worker process.
+    
+    Renditions are produced largest first; each is resampled from the
+    previous one in the same mode when that is at least LADDER_GAP times
+    bigger, otherwise from the decoded source. With low_memory the source is reduced while
+    decoding (JPEG draft or band-by-band) so it never sits in RAM at full
+    resolution. Returns a dict of stats: native and decoded pixel counts,
+    seconds spent, per-stage seconds (decode, convert, resize, encode,
+    write), per-format encode seconds and bytes read and written.
+    
+    With write=False nothing is written: the encoded outputs come back in
+    stats['encoded'] as (path, bytes) pairs for write_outputs to store.
+    """
+    renditions = get_renditions(settings)
+    output_paths = rendition_paths(output_base, settings)
+    reducing_gap = DOWNSCALE_MODES[settings.get('downscale', 'off')]
+    profile = settings.get('profile', DEFAULT_PROFILE)
+    encode_seconds = {}
+    encoded = []
+    bytes_out = 0
+    start = time.perf_counter()
+    clock = StageClock()
+    
+    # Decode big enough for every rendition: the widest need not be the tallest
+    keep_width = max(rendition['width'] for rendition in renditions)
+    keep_height = max(rendition['height'] for rendition in renditions)
+    if low_memory:
+        reducing_gap = reducing_gap or DOWNSCALE_MODES['quality']
+    
+    with Image.open(source_path) as img:
+        native_pixels = img.width * img.height
+        decoded_pixels = native_pixels
+        reduced = None
+        if low_memory and img.format != 'JPEG':
+            reduced = load_reduced_by_strips(source_path, keep_width, keep_height, reducing_gap)
+        if reduced is not None:
+            img = reduced
+        elif reducing_gap is not None:
+            img, decoded_pixels = fast_downscale(img, keep_width, keep_height, reducing_gap)
+        img.load()
+        img = to_8bit_mode(img)
+        clock.lap('decode')
+        
+        if write:
+            os.makedirs(os.path.dirname(output_base) or '.', exist_ok=True)
+        # Last rendition in each mode; one converted to RGB for JPEG has lost
+        # the alpha that later PNG or WEBP renditions must keep
+        previous_by_mode = {}
+        for rendition, output_path in zip(renditions, output_paths):
+            width, height = rendition['width'], rendition['height']
+            needs_rgb = img.mode in ('RGBA', 'P') and rendition['format'] in ['jpg', 'jpeg']
+            previous = previous_by_mode.get(img.mode)
+            if needs_rgb:
+                previous = previous_by_mode.get('RGB', previous)
+            base = img
+            if (previous is not None and previous.width >= width * LADDER_GAP
+                    and previous.height >= height * LADDER_GAP):
+                base = previous
+            
+            # Convert to RGB if necessary
+            if base.mode in ('RGBA', 'P') and rendition['format'] in ['jpg', 'jpeg']:
+                base = base.convert('RGB')
+                clock.lap('convert')
+            
+            resized_img = base.resize((width, height), Image.Resampling.LANCZOS)
+            clock.lap('resize')
+            
+            # Encode in memory first so encode and disk write are timed apart
+            save_format, save_kwargs = get_save_options(rendition['format'], rendition['quality'], profile)
+            buffer = BytesIO()
+            if save_format in ('PNG', 'GIF') and settings.get('lossless_optimize'):
+                # Workers already fill every core, so keep the trial threads few
+                data, _ = optimize_lossless(resized_img, save_format, workers=2)
+                buffer.write(data)
+            else:
+                resized_img.save(buffer, save_format, **save_kwargs)
+            encode_seconds[save_format] = encode_seconds.get(save_format, 0) + clock.lap('encode')
+            
+            bytes_out += buffer.tell()
+            if write:
+                write_atomic(output_path, buffer.getbuffer())
+                clock.lap('write')
+            else:
+                encoded.append((output_path, buffer.getvalue()))
+            previous_by_mode[resized_img.mode] = resized_img
+    
+    return {
+        'encoded': encoded,
+        'native_pixels': native_pixels,
+        'decoded_pixels': decoded_pixels,
+        'seconds': time.perf_counter() - start,
+        'stages': clock.stages,
+        'encode_seconds': encode_seconds,
+        'bytes_in': os.path.getsize(source_path),
+        'bytes_out': bytes_out,
+    }
+
+def convert_batch(jobs, settings, workers=None, memory_budget=None, cancel=None,
+                  io_workers=DEFAULT_IO_WORKERS):
+    """Convert (source_path, output_base) jobs on a process pool.
+    
+    Yields (source_path, output_base, stats, error) tuples in completion
+    order; stats is the dict returned by convert_one and error is None on
+    success. Only a bounded window of jobs is submitted at a time so huge
+    folders don't queue every future up front.
+    
+    With a memory_budget (bytes), each job's decoded size is estimated from
+    its header and jobs are only admitted while the estimates in flight fit
+    the budget. Images larger than the whole budget run alone on the
+    low-memory path.
+    
+    With io_workers, workers only encode into memory and the bytes are
+    written by a thread pool here, so encoding overlaps slow writes. At
+    most io_workers * 4 writes are queued; beyond that no new conversions
+    start until writes drain. A job is yielded once its outputs are written.
+    
+    When the cancel event is set, no new jobs are started, queued ones are
+    dropped and the jobs already running are allowed to finish and report.
+    
+    If a worker dies (e.g. killed for running out of memory) the pool is
+    broken: nothing more is submitted and every job not yet converted is
+    reported with the BrokenProcessPool error.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+    max_writes = io_workers * 4
+    write_in_worker = not io_workers
+    jobs = iter(jobs)
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            ThreadPoolExecutor(max_workers=io_workers or 1) as io_pool:
+        pending = {}
+        writes = {}
+        exhausted = False
+        broken = None
+        held = None
+        in_use = 0
+        while True:
+            if cancel is not None and cancel.is_set():
+                for future in list(pending):
+                    if future.cancel():
+                        in_use -= pending.pop(future)[2]
+                held = None
+                exhausted = True
+            
+            while (not exhausted and broken is None and len(pending) < max_pending
+                   and (write_in_worker or len(writes) < max_writes)):
+                if held is None:
+                    try:
+                        job = next(jobs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    cost = 0
+                    if memory_budget:
+                        try:
+                            cost = estimate_decoded_bytes(job[0])
+                        except Exception:
+                            # Let the worker report unreadable files
+                            cost = 0
+                    held = (job, cost)
+                
+                (source_path, output_base), cost = held
+                low_memory = bool(memory_budget) and cost > memory_budget
+                charge = memory_budget if low_memory else cost
+                if pending and memory_budget and in_use + charge > memory_budget:
+                    # Wait for running jobs to release memory
+                    break
+                
+                try:
+                    future = pool.submit(convert_one, source_path, output_base, settings, low_memory,
+                                         write_in_worker)
+                except BrokenProcessPool as e:
+                    broken = e
+                    break
+                pending[future] = (source_path, output_base, charge)
+                in_use += charge
+                held = None
+            
+            if not pending and not writes:
+                break
+            
+            done, _ = wait(list(pending) + list(writes), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in writes:
+                    source_path, output_base, stats = writes.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        stats['stages']['write'] = future.result()
+                    yield source_path, output_base, stats if error is None else None, error
+                    continue
+                
+                source_path, output_base, charge = pending.pop(future)
+                in_use -= charge
+                error = future.exception()
+                if isinstance(error, BrokenProcessPool):
+                    broken = error
+                stats = future.result() if error is None else None
+                if error is None and not write_in_worker:
+                    write = io_pool.submit(write_outputs, stats.pop('encoded'))
+                    writes[write] = (source_path, output_base, stats)
+                    continue
+                if stats is not None:
+                    del stats['encoded']
+                yield source_path, output_base, stats, error
+    
+    if broken is not None and not (cancel is not None and cancel.is_set()):
+        if held is not None:
+            (source_path, output_base), _ = held
+            yield source_path, output_base, None, broken
+        for source_path, output_base in jobs:
+            yield source_path, output_base, None, broken
+
+def scan_images(input_folder, exclude=None):
+    """Recursively yield supported image paths under input_folder as they are found.
+    
+    Uses os.scandir so file types come from the directory entries without an
+    extra stat per file. The exclude folder (typically the output folder) is
+    not descended into.
+    """
+    exclude = os.path.abspath(exclude) if exclude else None
+    stack = [input_folder]
+    while stack:
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if os.path.abspath(entry.path) != exclude:
+                            stack.append(entry.path)
+                    elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_FORMATS:
+                        yield entry.path
+        except OSError as e:
+            print(f"Error scanning {folder}: {str(e)}")
+
+def output_base_for(source_path, input_folder, output_folder):
+    """Mirror a source path under the output folder, without an extension."""
+    relative = os.path.relpath(source_path, input_folder)
+    return os.path.join(output_folder, os.path.splitext(relative)[0])
+
+class ImageScanner:
+    """Run scan_images on a background thread so discovery overlaps conversion.
+    
+    Iterating the scanner yields paths as soon as they are found; found holds
+    the live count and finished turns True once the walk is complete.
+    """
+    
+    def __init__(self, input_folder, exclude=None):
+        self.input_folder = input_folder
+        self.exclude = exclude
+        self.found = 0
+        self.finished = False
+        self._stopped = False
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop walking the tree; iteration ends after already queued paths."""
+        self._stopped = True
+    
+    def _run(self):
+        try:
+            for path in scan_images(self.input_folder, self.exclude):
+                if self._stopped:
+                    break
+                self.found += 1
+                self._queue.put(path)
+        finally:
+            self.finished = True
+            self._queue.put(None)
+    
+    def __iter__(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            yield path
+
+class ConversionManifest:
+    """Record of converted sources, stored in the output folder.
+    
+    Entries are keyed on the absolute source path and remember the source
+    size and mtime, the conversion parameters and the output path. A source
+    whose entry still matches and whose output exists can be skipped without
+    opening it.
+    
+    Every record is also appended to a journal right away, and the journal
+    is replayed on load, so a cancelled or crashed run resumes from the last
+    completed file rather than the last periodic save.
+    """
+    
+    def __init__(self, output_folder, save_every=500):
+        self.path = os.path.join(output_folder, MANIFEST_NAME)
+        self.journal_path = os.path.join(output_folder, JOURNAL_NAME)
+        self.save_every = save_every
+        self.entries = {}
+        self.unsaved = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == 2:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            self.entries = {}
+        self.replay_journal()
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+    
+    def replay_journal(self):
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        source, entry = json.loads(line)
+                    except ValueError:
+                        # The last line may be cut short by a crash
+                        continue
+                    self.entries[source] = entry
+        except OSError:
+            pass
+    
+    @staticmethod
+    def params_for(settings):
+        """Parameters that affect the output bytes, including save options."""
+        profile = settings.get('profile', DEFAULT_PROFILE)
+        params = {'downscale': settings.get('downscale', 'off'), 'profile': profile,
+                  'lossless_optimize': bool(settings.get('lossless_optimize')), 'renditions': []}
+        for rendition in get_renditions(settings):
+            save_format, save_kwargs = get_save_options(rendition['format'], rendition['quality'], profile)
+            params['renditions'].append(dict(rendition, save_format=save_format, **save_kwargs))
+        return params
+    
+    def is_current(self, source_path, output_paths, params):
+        entry = self.entries.get(os.path.abspath(source_path))
+        if entry is None or entry['params'] != params:
+            return False
+        if entry['outputs'] != [os.path.abspath(p) for p in output_paths]:
+            return False
+        if not all(os.path.exists(p) for p in output_paths):
+            return False
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return False
+        return entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns
+    
+    def record(self, source_path, output_paths, params):
+        st = os.stat(source_path)
+        self.entries[os.path.abspath(source_path)] = {
+            'size': st.st_size,
+            'mtime': st.st_mtime_ns,
+            'params': params,
+            'outputs': [os.path.abspath(p) for p in output_paths],
+        }
+        source = os.path.abspath(source_path)
+        self.journal.write(json.dumps([source, self.entries[source]]) + "\n")
+        self.journal.flush()
+        self.unsaved += 1
+        if self.unsaved >= self.save_every:
+            self.save()
+    
+    def save(self):
+        """Write the manifest atomically so a crash never leaves it half-written."""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 2, 'entries': self.entries}, f)
+        os.replace(temp_path, self.path)
+        # Everything journaled so far is now in the manifest
+        self.journal.close()
+        self.journal = open(self.journal_path, 'w', encoding='utf-8')
+        self.unsaved = 0
+    
+    def close(self):
+        self.save()
+        self.journal.close()
+
+class DedupeIndex:
+    """Finds byte-identical sources so each unique content is converted once.
+    
+    Only files whose size matches an earlier source are hashed, so unique
+    files cost a stat. The first source seen with some content is the
+    primary and gets converted. Later duplicates get their outputs linked
+    to the primary's outputs, either right away or once the primary
+    finishes.
+    """
+    
+    def __init__(self):
+        self.by_size = {}
+        self.by_hash = {}
+        self.hashes = {}
+        self.primaries = {}
+        self.duplicates = 0
+        self.seconds_saved = 0
+    
+    def find_primary(self, source_path):
+        """Return the primary with the same content, or None if source_path is new.
+        
+        A file that can't be read is treated as unique; converting it
+        reports the error.
+        """
+        try:
+            primary = self._match(source_path)
+        except OSError:
+            primary = None
+        if primary is None:
+            self.primaries[source_path] = {'status': 'pending', 'outputs': None, 'seconds': 0, 'waiting': []}
+        return primary
+    
+    def _match(self, source_path):
+        size = os.path.getsize(source_path)
+        candidates = self.by_size.setdefault(size, [])
+        if candidates:
+            for candidate in candidates:
+                if candidate not in self.hashes:
+                    self.hashes[candidate] = hash_file(candidate)
+                    self.by_hash.setdefault(self.hashes[candidate], candidate)
+            digest = hash_file(source_path)
+            if digest in self.by_hash:
+                return self.by_hash[digest]
+            self.hashes[source_path] = digest
+            self.by_hash[digest] = source_path
+        candidates.append(source_path)
+        return None
+    
+    def add_duplicate(self, primary, source_path, output_paths):
+        """Link a duplicate now if its primary is done.
+        
+        Returns 'linked', 'failed' if the primary already failed, or
+        'waiting' if it is still being converted.
+        """
+        state = self.primaries[primary]
+        if state['status'] == 'done':
+            self._link(state, output_paths)
+            return 'linked'
+        if state['status'] == 'failed':
+            return 'failed'
+        state['waiting'].append((source_path, output_paths))
+        return 'waiting'
+    
+    def complete(self, primary, output_paths, seconds=0):
+        """Mark a primary converted; returns the (source, outputs) duplicates linked."""
+        state = self.primaries[primary]
+        state.update(status='done', outputs=output_paths, seconds=seconds)
+        linked = state['waiting']
+        state['waiting'] = []
+        for source_path, duplicate_outputs in linked:
+            self._link(state, duplicate_outputs)
+        return linked
+    
+    def fail(self, primary):
+        """Mark a primary failed; returns the duplicates that fail with it."""
+        state = self.primaries[primary]
+        state['status'] = 'failed'
+        failed = state['waiting']
+        state['waiting'] = []
+        return failed
+    
+    def _link(self, state, output_paths):
+        for source, target in zip(state['outputs'], output_paths):
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            link_or_copy(source, target)
+        self.duplicates += 1
+        self.seconds_saved += state['seconds']
+
+class PipelineTrace:
+    """Collects per-file stage timings in the main process.
+    
+    Optionally appends one JSON line per file to a trace file; summary()
+    renders per-stage totals, percentiles and a log2 millisecond histogram.
+    """
+    
+    STAGES = ('decode', 'convert', 'resize', 'encode', 'write')
+    
+    def __init__(self, trace_path=None):
+        self.durations = {stage: [] for stage in self.STAGES}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.files = 0
+        self.trace_file = open(trace_path, 'a', encoding='utf-8') if trace_path else None
+    
+    def record(self, source_path, stats):
+        self.files += 1
+        self.bytes_in += stats['bytes_in']
+        self.bytes_out += stats['bytes_out']
+        for stage, seconds in stats['stages'].items():
+            self.durations[stage].append(seconds)
+        if self.trace_file:
+            self.trace_file.write(json.dumps({
+                'source': source_path,
+                'stages': stats['stages'],
+                'bytes_in': stats['bytes_in'],
+                'bytes_out': stats['bytes_out'],
+                'native_pixels': stats['native_pixels'],
+                'decoded_pixels': stats['decoded_pixels'],
+            }) + "\n")
+    
+    def close(self):
+        if self.trace_file:
+            self.trace_file.close()
+            self.trace_file = None
+    
+    def summary(self):
+        """Return a text report of where the pipeline spent its time."""
+        grand_total = sum(sum(values) for values in self.durations.values())
+        lines = [f"{self.files} files, {self.bytes_in / 1e6:.1f} MB in, {self.bytes_out / 1e6:.1f} MB out",
+                 f"{'Stage':<8}{'total s':>9}{'share':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}  histogram (ms)"]
+        for stage, values in self.durations.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            total = sum(ordered)
+            share = 100 * total / grand_total if grand_total else 0
+            p50 = ordered[len(ordered) // 2] * 1000
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+            lines.append(f"{stage:<8}{total:>9.2f}{share:>6.0f}%{p50:>9.1f}{p95:>9.1f}{ordered[-1] * 1000:>9.1f}  "
+                         + self.histogram(ordered))
+        return "\n".join(lines)
+    
+    @staticmethod
+    def histogram(values):
+        """Counts per power-of-two millisecond bucket, e.g. '<1:5 <2:10 <4:3'."""
+        buckets = {}
+        for seconds in values:
+            bucket = 1
+            while seconds * 1000 >= bucket:
+                bucket *= 2
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+        return " ".join(f"<{bucket}:{count}" for bucket, count in sorted(buckets.items()))
+
+def summarize_downscale(native_pixels, decoded_pixels, seconds):
+    """Describe the decoded-pixel savings of a batch as a short report line."""
+    if not native_pixels or not decoded_pixels:
+        return ""
+    saved = 100 * (1 - decoded_pixels / native_pixels)
+    ratio = native_pixels / decoded_pixels
+    # Throughput is measured against native pixels so it compares directly
+    # with a run where fast downscale is off.
+    rate = native_pixels / 1e6 / seconds if seconds else 0
+    return (f"Decoded {decoded_pixels / 1e6:.1f} MP of {native_pixels / 1e6:.1f} MP "
+            f"({saved:.0f}% saved, ~{ratio:.1f}x fewer pixels, {rate:.1f} native MP/s)")
+
+def calibrate_profiles(sample_paths, width, height, formats=('jpg', 'png', 'webp')):
+    """Measure encode cost and output size of every profile on sample images.
+    
+    Each sample is decoded and resized to width x height once, then encoded
+    in memory with every profile/format pair. A pair that fails to encode
+    a sample (e.g. CMYK as PNG) skips it; pairs with no successful encode
+    are left out. Returns
+    {profile: {format: {'ms_per_mp': ..., 'bytes_per_mp': ...}}}.
+    """
+    # Seconds, bytes and megapixels per pair, since pairs may skip samples
+    totals = {profile: {fmt: [0.0, 0, 0.0] for fmt in formats} for profile in ENCODER_PROFILES}
+    
+    for path in sample_paths:
+        try:
+            with Image.open(path) as img:
+                resized_img = img.resize((width, height), Image.Resampling.LANCZOS)
+        except Exception as e:
+            print(f"Skipping calibration sample {path}: {str(e)}")
+            continue
+        rgb_img = resized_img if resized_img.mode == 'RGB' else resized_img.convert('RGB')
+        
+        for profile in ENCODER_PROFILES:
+            for fmt in formats:
+                save_format, save_kwargs = get_save_options(fmt, profile=profile)
+                source = rgb_img if save_format == 'JPEG' else resized_img
+                buffer = BytesIO()
+                start = time.perf_counter()
+                try:
+                    source.save(buffer, save_format, **save_kwargs)
+                except Exception as e:
+                    print(f"Skipping calibration sample {path} for {profile} {fmt}: {str(e)}")
+                    continue
+                totals[profile][fmt][0] += time.perf_counter() - start
+                totals[profile][fmt][1] += buffer.tell()
+                totals[profile][fmt][2] += width * height / 1e6
+    
+    results = {}
+    for profile, by_format in totals.items():
+        for fmt, (seconds, size, megapixels) in by_format.items():
+            if megapixels:
+                results.setdefault(profile, {})[fmt] = {
+                    'ms_per_mp': seconds * 1000 / megapixels,
+                    'bytes_per_mp': size / megapixels,
+                }
+    return results
+
+def format_calibration(results):
+    """Render calibrate_profiles results as a fixed-width table."""
+    lines = [f"{'Profile':<16}{'Format':<8}{'ms/MP':>10}{'KB/MP':>10}"]
+    for profile, by_format in results.items():
+        for fmt, row in by_format.items():
+            lines.append(f"{profile:<16}{fmt:<8}{row['ms_per_mp']:>10.1f}{row['bytes_per_mp'] / 1024:>10.1f}")
+    return "\n".join(lines)
+
+class ProgressChannel:
+    """Thread-safe queue of progress events from a worker thread to the UI.
+    
+    Workers post events as they happen; the UI drains the whole queue on a
+    fixed-rate timer, so its cost doesn't grow with the image rate.
+    """
+    
+    def __init__(self):
+        self._queue = queue.Queue()
+    
+    def post(self, kind, **data):
+        self._queue.put((kind, data))
+    
+    def drain(self):
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+def format_duration(seconds):
+    """Format seconds as H:MM:SS for ETA display."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
 
 class ImageConverterGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Batch Image Converter")
-        self.root.geometry("600x400")
+        self.root.geometry("640x560")
         self.root.resizable(True, True)
         
         # Create main frame
@@ -49,6 +1012,51 @@ class ImageConverterGUI:
         self.height_var = tk.StringVar(value="600")
         ttk.Entry(size_frame, textvariable=self.height_var, width=10).grid(row=0, column=3)
         
+        ttk.Label(size_frame, text="Workers:").grid(row=0, column=4, padx=5)
+        self.workers_var = tk.StringVar(value=str(os.cpu_count() or 1))
+        ttk.Spinbox(size_frame, from_=1, to=256, textvariable=self.workers_var, width=5).grid(row=0, column=5)
+        
+        ttk.Label(size_frame, text="Downscale:").grid(row=1, column=0, padx=5, pady=5)
+        self.downscale_var = tk.StringVar(value="off")
+        ttk.Combobox(size_frame, textvariable=self.downscale_var, values=list(DOWNSCALE_MODES),
+                     state="readonly", width=10).grid(row=1, column=1, columnspan=2, sticky=tk.W)
+        
+        ttk.Label(size_frame, text="Profile:").grid(row=1, column=3, padx=5, pady=5)
+        self.profile_var = tk.StringVar(value=DEFAULT_PROFILE)
+        ttk.Combobox(size_frame, textvariable=self.profile_var, values=list(ENCODER_PROFILES),
+                     state="readonly", width=15).grid(row=1, column=4, columnspan=2, sticky=tk.W)
+        
+        ttk.Label(size_frame, text="Renditions:").grid(row=2, column=0, padx=5, pady=5)
+        self.renditions_var = tk.StringVar()
+        ttk.Entry(size_frame, textvariable=self.renditions_var, width=50).grid(
+            row=2, column=1, columnspan=5, sticky=(tk.W, tk.E))
+        ttk.Label(size_frame, text="Optional, e.g. thumb:200x150:webp:80, large:1600x1200:jpg:90").grid(
+            row=3, column=1, columnspan=5, sticky=tk.W)
+        
+        self.incremental_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(size_frame, text="Skip unchanged files", 
+                        variable=self.incremental_var).grid(row=4, column=1, columnspan=2, sticky=tk.W)
+        
+        self.trace_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(size_frame, text="Write timing trace", 
+                        variable=self.trace_var).grid(row=5, column=1, columnspan=2, sticky=tk.W)
+        
+        self.dedupe_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(size_frame, text="Link duplicate files", 
+                        variable=self.dedupe_var).grid(row=5, column=3, columnspan=3, sticky=tk.W)
+        
+        ttk.Label(size_frame, text="RAM budget (MB):").grid(row=4, column=3, padx=5, pady=5)
+        self.memory_var = tk.StringVar(value=str(DEFAULT_MEMORY_BUDGET_MB))
+        ttk.Entry(size_frame, textvariable=self.memory_var, width=8).grid(row=4, column=4, sticky=tk.W)
+        
+        self.lossless_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(size_frame, text="Lossless PNG optimiser", 
+                        variable=self.lossless_var).grid(row=6, column=1, columnspan=2, sticky=tk.W)
+        
+        ttk.Label(size_frame, text="Write threads:").grid(row=6, column=3, padx=5, pady=5)
+        self.io_workers_var = tk.StringVar(value=str(DEFAULT_IO_WORKERS))
+        ttk.Spinbox(size_frame, from_=0, to=64, textvariable=self.io_workers_var, width=5).grid(row=6, column=4, sticky=tk.W)
+        
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress = ttk.Progressbar(main_frame, length=400, mode='determinate', variable=self.progress_var)
@@ -59,9 +1067,17 @@ class ImageConverterGUI:
         self.status_label = ttk.Label(main_frame, textvariable=self.status_var)
         self.status_label.grid(row=5, column=0, columnspan=3)
         
-        # Convert button
-        self.convert_btn = ttk.Button(main_frame, text="Convert Images", command=self.start_conversion)
-        self.convert_btn.grid(row=6, column=0, columnspan=3, pady=10)
+        # Convert and calibrate buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=6, column=0, columnspan=3, pady=10)
+        self.convert_btn = ttk.Button(button_frame, text="Convert Images", command=self.start_conversion)
+        self.convert_btn.grid(row=0, column=0, padx=5)
+        self.calibrate_btn = ttk.Button(button_frame, text="Calibrate Profiles", command=self.start_calibration)
+        self.calibrate_btn.grid(row=0, column=1, padx=5)
+        self.cancel_btn = ttk.Button(button_frame, text="Cancel", command=self.cancel_conversion)
+        self.cancel_btn.grid(row=0, column=2, padx=5)
+        self.cancel_btn.state(['disabled'])
+        self.cancel_event = threading.Event()
     
     def browse_input(self):
         folder = filedialog.askdirectory(title="Select Input Folder")
@@ -88,93 +1104,279 @@ class ImageConverterGUI:
         except ValueError:
             messagebox.showerror("Error", "Width and height must be positive numbers!")
             return False
+        try:
+            if int(self.workers_var.get()) <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Workers must be a positive number!")
+            return False
+        try:
+            if int(self.memory_var.get()) <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "RAM budget must be a positive number!")
+            return False
+        try:
+            if int(self.io_workers_var.get()) < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Write threads must be zero or a positive number!")
+            return False
+        try:
+            parse_renditions(self.renditions_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", f"{str(e)}\nUse name:WIDTHxHEIGHT:format[:quality], separated by commas.")
+            return False
         return True
     
     def start_conversion(self):
         if not self.validate_inputs():
             return
         
+        # Read the Tk variables here; the worker thread must not touch Tk
+        job = {
+            'input_folder': self.input_path.get(),
+            'output_folder': self.output_path.get(),
+            'settings': {
+                'format': self.format_var.get(),
+                'width': int(self.width_var.get()),
+                'height': int(self.height_var.get()),
+                'downscale': self.downscale_var.get(),
+                'renditions': parse_renditions(self.renditions_var.get()),
+                'profile': self.profile_var.get(),
+                'lossless_optimize': self.lossless_var.get(),
+            },
+            'workers': int(self.workers_var.get()),
+            'memory_budget': int(self.memory_var.get()) * 1024 * 1024,
+            'io_workers': int(self.io_workers_var.get()),
+            'incremental': self.incremental_var.get(),
+            'trace': self.trace_var.get(),
+            'dedupe': self.dedupe_var.get(),
+        }
+        
         # Disable convert button during conversion
         self.convert_btn.state(['disabled'])
+        self.calibrate_btn.state(['disabled'])
+        self.cancel_btn.state(['!disabled'])
+        self.cancel_event.clear()
         self.status_var.set("Converting...")
         self.progress_var.set(0)
+        self.start_progress()
         
         # Start conversion in a separate thread
-        thread = threading.Thread(target=self.convert_images)
+        thread = threading.Thread(target=self.convert_images, args=(job,))
         thread.daemon = True
         thread.start()
     
-    def convert_images(self):
-        input_folder = self.input_path.get()
-        output_folder = self.output_path.get()
-        target_format = self.format_var.get()
-        width = int(self.width_var.get())
-        height = int(self.height_var.get())
+    def cancel_conversion(self):
+        """Stop after the images currently being converted; the job can resume later."""
+        self.cancel_event.set()
+        self.cancel_btn.state(['disabled'])
+    
+    def start_progress(self):
+        """Reset the counters and start draining the progress channel."""
+        self.channel = ProgressChannel()
+        self.counts = {'converted': 0, 'linked': 0, 'skipped': 0, 'error': 0}
+        self.total = 0
+        self.scanning = True
+        self.started = time.perf_counter()
+        self.root.after(PROGRESS_INTERVAL_MS, self.poll_progress)
+    
+    def poll_progress(self):
+        """Apply every queued event, then refresh the widgets once."""
+        done = None
+        for kind, data in self.channel.drain():
+            if kind == 'done':
+                done = data
+            else:
+                self.counts[kind] += 1
+                self.total = data['total']
+                self.scanning = data['scanning']
+        
+        if done is not None:
+            messagebox.showinfo(done['title'], done['message'])
+            self.reset_ui()
+            return
+        
+        finished = sum(self.counts.values())
+        if self.total:
+            self.progress_var.set(finished / self.total * 100)
+            elapsed = time.perf_counter() - self.started
+            processed = self.counts['converted'] + self.counts['error']
+            rate = processed / elapsed if elapsed else 0
+            suffix = "+" if self.scanning else ""
+            status = f"Converting: {finished}/{self.total}{suffix}  {rate:.1f} img/s"
+            if rate and not self.scanning:
+                status += f"  ETA {format_duration((self.total - finished) / rate)}"
+            if self.counts['error']:
+                status += f"  Errors: {self.counts['error']}"
+            if self.cancel_event.is_set():
+                status = "Cancelling... " + status
+            self.status_var.set(status)
+        self.root.after(PROGRESS_INTERVAL_MS, self.poll_progress)
+    
+    def convert_images(self, job):
+        """Worker thread: always posts 'done', so the UI is reset even if the job dies."""
+        title, message = "Error", "Conversion stopped unexpectedly."
+        try:
+            title, message = self.run_job(job)
+        except Exception as e:
+            print(f"Error converting images: {str(e)}")
+            message = f"Conversion stopped: {str(e)}"
+        finally:
+            self.channel.post('done', title=title, message=message)
+    
+    def run_job(self, job):
+        """Convert a folder as described by job; returns the (title, message) to show."""
+        input_folder = job['input_folder']
+        output_folder = job['output_folder']
+        settings = job['settings']
+        channel = self.channel
         
         # Create output folder if it doesn't exist
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
         
-        # Supported formats
-        supported_formats = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp']
+        manifest = ConversionManifest(output_folder)
+        params = ConversionManifest.params_for(settings)
+        trace = PipelineTrace(os.path.join(output_folder, TRACE_NAME) if job['trace'] else None)
+        scanner = ImageScanner(input_folder, exclude=output_folder).start()
+        dedupe = DedupeIndex() if job['dedupe'] else None
+        skipped = 0
+        
+        def iter_jobs():
+            nonlocal skipped
+            for source_path in scanner:
+                output_base = output_base_for(source_path, input_folder, output_folder)
+                output_paths = rendition_paths(output_base, settings)
+                progress = {'total': scanner.found, 'scanning': not scanner.finished}
+                if job['incremental'] and manifest.is_current(source_path, output_paths, params):
+                    skipped += 1
+                    # Unchanged outputs can still serve later duplicates
+                    if dedupe is not None and dedupe.find_primary(source_path) is None:
+                        dedupe.complete(source_path, output_paths)
+                    channel.post('skipped', **progress)
+                    continue
+                if dedupe is not None:
+                    primary = dedupe.find_primary(source_path)
+                    if primary is not None:
+                        status = dedupe.add_duplicate(primary, source_path, output_paths)
+                        if status == 'linked':
+                            manifest.record(source_path, output_paths, params)
+                            channel.post('linked', **progress)
+                        elif status == 'failed':
+                            print(f"Error converting {os.path.basename(source_path)}: duplicate of failed source")
+                            channel.post('error', **progress)
+                        continue
+                yield source_path, output_base
+        
+        converted = 0
+        native_pixels = 0
+        decoded_pixels = 0
+        seconds = 0
+        results = convert_batch(iter_jobs(), settings, job['workers'], job['memory_budget'],
+                                self.cancel_event, job['io_workers'])
+        try:
+            for source_path, output_base, stats, error in results:
+                # The total keeps growing while the scanner is still walking
+                progress = {'total': scanner.found, 'scanning': not scanner.finished}
+                if error is None:
+                    converted += 1
+                    output_paths = rendition_paths(output_base, settings)
+                    manifest.record(source_path, output_paths, params)
+                    native_pixels += stats['native_pixels']
+                    decoded_pixels += stats['decoded_pixels']
+                    seconds += stats['seconds']
+                    trace.record(source_path, stats)
+                    channel.post('converted', **progress)
+                    if dedupe is not None:
+                        linked = dedupe.complete(source_path, output_paths, stats['seconds'])
+                        for duplicate, duplicate_outputs in linked:
+                            manifest.record(duplicate, duplicate_outputs, params)
+                            channel.post('linked', **progress)
+                else:
+                    print(f"Error converting {os.path.basename(source_path)}: {str(error)}")
+                    channel.post('error', **progress)
+                    if dedupe is not None:
+                        for duplicate, _ in dedupe.fail(source_path):
+                            print(f"Error converting {os.path.basename(duplicate)}: duplicate of failed source")
+                            channel.post('error', **progress)
+        finally:
+            # Keep what was converted even if the job dies part way
+            scanner.stop()
+            trace.close()
+            manifest.close()
         
-        # Get total number of images
-        image_files = [f for f in os.listdir(input_folder) 
-                      if os.path.splitext(f)[1].lower() in supported_formats]
-        total_images = len(image_files)
+        if self.cancel_event.is_set():
+            message = (f"Conversion cancelled after {converted} images.\n"
+                       "Run it again with 'Skip unchanged files' on to resume.")
+            return "Cancelled", message
         
+        total_images = scanner.found
         if total_images == 0:
-            self.root.after(0, lambda: messagebox.showinfo("Info", "No images found in input folder!"))
-            self.root.after(0, self.reset_ui)
+            return "Info", "No images found in input folder!"
+        
+        message = f"Conversion complete!\nConverted {converted} out of {total_images} images."
+        if skipped:
+            message += f"\nSkipped {skipped} unchanged images."
+        if dedupe is not None and dedupe.duplicates:
+            message += (f"\nLinked {dedupe.duplicates} duplicate images, "
+                        f"saving ~{dedupe.seconds_saved:.1f} CPU seconds.")
+        if settings['downscale'] != 'off':
+            report = summarize_downscale(native_pixels, decoded_pixels, seconds)
+            print(report)
+            message += "\n" + report
+        if job['trace'] and trace.files:
+            print(trace.summary())
+            message += f"\nTiming trace written to {TRACE_NAME}"
+        
+        return "Success", message
+    
+    def start_calibration(self):
+        if not self.validate_inputs():
             return
         
-        converted = 0
-        for filename in image_files:
-            try:
-                # Open and convert image
-                with Image.open(os.path.join(input_folder, filename)) as img:
-                    # Convert to RGB if necessary
-                    if img.mode in ('RGBA', 'P') and target_format.lower() in ['jpg', 'jpeg']:
-                        img = img.convert('RGB')
-                    
-                    resized_img = img.resize((width, height), Image.Resampling.LANCZOS)
-                    new_filename = os.path.splitext(filename)[0] + '.' + target_format
-                    
-                    # Handle format-specific saving
-                    save_format = 'JPEG' if target_format.lower() in ['jpg', 'jpeg'] else target_format.upper()
-                    save_kwargs = {}
-                    
-                    if save_format == 'JPEG':
-                        save_kwargs['quality'] = 95
-                    elif save_format == 'PNG':
-                        save_kwargs['optimize'] = True
-                    elif save_format == 'WEBP':
-                        save_kwargs['quality'] = 95
-                        save_kwargs['method'] = 6
-                    
-                    resized_img.save(
-                        os.path.join(output_folder, new_filename),
-                        save_format,
-                        **save_kwargs
-                    )
-                    converted += 1
-                    
-                    # Update progress
-                    progress = (converted / total_images) * 100
-                    self.progress_var.set(progress)
-                    self.status_var.set(f"Converting: {converted}/{total_images}")
-            
-            except Exception as e:
-                print(f"Error converting {filename}: {str(e)}")
-                self.status_var.set(f"Error converting {filename}")
+        args = (self.input_path.get(), self.output_path.get(),
+                int(self.width_var.get()), int(self.height_var.get()))
+        self.convert_btn.state(['disabled'])
+        self.calibrate_btn.state(['disabled'])
+        self.status_var.set("Calibrating encoder profiles...")
+        self.start_progress()
+        
+        thread = threading.Thread(target=self.calibrate, args=args)
+        thread.daemon = True
+        thread.start()
+    
+    def calibrate(self, input_folder, output_folder, width, height, sample_size=10):
+        """Worker thread: always posts 'done', so the UI is reset even if calibration dies."""
+        title, message = "Error", "Calibration stopped unexpectedly."
+        try:
+            title, message = self.run_calibration(input_folder, output_folder, width, height, sample_size)
+        except Exception as e:
+            print(f"Error calibrating: {str(e)}")
+            message = f"Calibration stopped: {str(e)}"
+        finally:
+            self.channel.post('done', title=title, message=message)
+    
+    def run_calibration(self, input_folder, output_folder, width, height, sample_size):
+        """Measure the profiles on sample images; returns the (title, message) to show."""
+        samples = []
+        for path in scan_images(input_folder, exclude=output_folder):
+            samples.append(path)
+            if len(samples) >= sample_size:
+                break
         
-        # Show completion message and reset UI
-        self.root.after(0, lambda: messagebox.showinfo("Success", 
-            f"Conversion complete!\nConverted {converted} out of {total_images} images."))
-        self.root.after(0, self.reset_ui)
+        results = calibrate_profiles(samples, width, height)
+        if results:
+            report = format_calibration(results)
+            print(report)
+            return "Calibration", f"Measured on {len(samples)} sample images:\n\n{report}"
+        return "Info", "No images found in input folder!"
     
     def reset_ui(self):
+        self.cancel_btn.state(['disabled'])
         self.convert_btn.state(['!disabled'])
+        self.calibrate_btn.state(['!disabled'])
         self.status_var.set("Ready")
         self.progress_var.set(0)
 
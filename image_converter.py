@@ -1,7 +1,170 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from png_optimizer import optimize_lossless
 import os
+import math
+import queue
+import threading
+
+# Output formats offered in the combobox
+FORMATS = ["PNG", "WEBP", "JPEG", "GIF"]
+
+# Default save settings per format
+SAVE_SETTINGS = {
+    'webp': {'quality': 90, 'method': 6},
+    'jpeg': {'quality': 90, 'optimize': True},
+    'png': {'optimize': True},
+    'gif': {},
+}
+
+# Pixel count of the downscaled proxy used for size previews
+PROXY_PIXELS = 512 * 512
+
+# How often the UI checks for background results, in milliseconds
+POLL_INTERVAL_MS = 100
+
+# Encoder settings tried alongside quality when searching for a size budget
+SIZE_SEARCH_VARIANTS = {
+    'jpeg': [{'optimize': True}, {'optimize': True, 'progressive': True}],
+    'webp': [{'method': 4}, {'method': 6}],
+}
+
+def encode(img, target_format, **save_kwargs):
+    """Encode an image into memory and return the bytes."""
+    buffer = BytesIO()
+    img.save(buffer, format=target_format, **save_kwargs)
+    return buffer.getvalue()
+
+def prepare_for_format(img, target_format):
+    """Convert modes the target format can't store."""
+    if target_format == 'jpeg' and img.mode != 'RGB':
+        # Convert to RGB if saving as JPEG
+        return img.convert('RGB')
+    return img
+
+def make_proxy(source_path):
+    """Decode a small proxy of the image; returns (proxy, full pixel count).
+    
+    thumbnail() lets JPEGs decode at a reduced DCT scale, so building the
+    proxy is much cheaper than a full decode.
+    """
+    with Image.open(source_path) as img:
+        full_pixels = img.width * img.height
+        scale = min(1.0, (PROXY_PIXELS / full_pixels) ** 0.5)
+        img.thumbnail((max(1, int(img.width * scale)), max(1, int(img.height * scale))))
+        return img.copy(), full_pixels
+
+def estimate_size(proxy, full_pixels, target_format):
+    """Estimate full-size output bytes from encodes of the proxy.
+    
+    Output size grows slower than pixel count because downscaled images
+    pack more detail per pixel, so the proxy is encoded at two scales and
+    bytes are extrapolated as pixels ** alpha, alpha clamped to [0.5, 1].
+    """
+    def encoded_size(img):
+        return len(encode(prepare_for_format(img, target_format), target_format, **SAVE_SETTINGS[target_format]))
+    
+    proxy_pixels = proxy.width * proxy.height
+    size = encoded_size(proxy)
+    if full_pixels <= proxy_pixels or proxy.width < 4 or proxy.height < 4:
+        return size
+    half = proxy.resize((proxy.width // 2, proxy.height // 2), Image.Resampling.LANCZOS)
+    half_size = encoded_size(half)
+    alpha = math.log(size / half_size) / math.log(proxy_pixels / (half.width * half.height)) if half_size else 1.0
+    alpha = min(1.0, max(0.5, alpha))
+    return int(size * (full_pixels / proxy_pixels) ** alpha)
+
+def convert_file(source_path, target_format, target_kb="", lossless_optimize=True):
+    """Convert one image next to its source; returns (output path, detail).
+    
+    With target_kb, JPEG and WEBP search for the best quality under the
+    budget; PNG and GIF raise ValueError if the optimized output is over it.
+    With lossless_optimize, PNG and GIF keep the smallest of the trial
+    encodes from png_optimizer. detail describes the chosen encoding for
+    the status line, or is None for a plain save.
+    """
+    directory = os.path.dirname(source_path)
+    filename = os.path.splitext(os.path.basename(source_path))[0]
+    target_path = os.path.join(directory, f"{filename}_converted.{target_format}")
+    detail = None
+    
+    # Open the source image
+    with Image.open(source_path) as img:
+        img = prepare_for_format(img, target_format)
+        
+        if target_kb:
+            target_bytes = int(float(target_kb) * 1024)
+            if target_format in SIZE_SEARCH_VARIANTS:
+                data, save_kwargs = encode_to_target(img, target_format, target_bytes)
+                detail = f"{len(data) / 1024:.1f} KB at quality {save_kwargs['quality']}"
+            else:
+                # PNG and GIF are lossless: the best we can do is optimize
+                data, description = optimize_lossless(img, target_format)
+                if len(data) > target_bytes:
+                    raise ValueError(f"{target_format.upper()} output is {len(data) / 1024:.1f} KB, "
+                                     f"over the {target_kb} KB target")
+                detail = f"{len(data) / 1024:.1f} KB ({description})"
+            with open(target_path, 'wb') as f:
+                f.write(data)
+        elif lossless_optimize and target_format in ('png', 'gif'):
+            data, description = optimize_lossless(img, target_format)
+            detail = f"{len(data) / 1024:.1f} KB ({description})"
+            with open(target_path, 'wb') as f:
+                f.write(data)
+        else:
+            # Save with optimal settings based on format
+            img.save(target_path, format=target_format, **SAVE_SETTINGS[target_format])
+    return target_path, detail
+
+def encode_to_target(img, target_format, target_bytes, workers=None):
+    """Find the highest-quality encoding that fits in target_bytes.
+    
+    The decoded image is reused for every candidate, one copy per thread
+    since Image.save keeps its options on the image. Each round encodes a
+    spread of qualities (times the encoder variants) in parallel threads,
+    where Pillow releases the GIL, and narrows the quality range around the
+    budget. Returns (data, save_kwargs) or raises ValueError if even the
+    lowest quality is too big.
+    """
+    workers = workers or min(8, os.cpu_count() or 1)
+    # Decode once up front; concurrent saves must not race on a lazy load
+    img.load()
+    variants = SIZE_SEARCH_VARIANTS[target_format]
+    local = threading.local()
+    
+    def encode_candidate(kwargs):
+        if not hasattr(local, 'img'):
+            local.img = img.copy()
+        return encode(local.img, target_format, **kwargs), kwargs
+    
+    best = None
+    low, high = 1, 100
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while low <= high:
+            # Spread enough qualities over the range to keep every thread busy;
+            # both ends are always tested so the range shrinks every round
+            steps = max(2, workers // len(variants))
+            qualities = sorted({low + (high - low) * i // (steps - 1) for i in range(steps)})
+            candidates = [dict(variant, quality=q) for q in qualities for variant in variants]
+            results = pool.map(encode_candidate, candidates)
+            
+            fitting = [(kwargs['quality'], -len(data), data, kwargs) for data, kwargs in results
+                       if len(data) <= target_bytes]
+            if not fitting:
+                break
+            # Highest quality, then smallest; never compare the bytes or kwargs
+            quality, _, data, kwargs = max(fitting, key=lambda fit: fit[:2])
+            best = (data, kwargs)
+            low = quality + 1
+            high = min([q for q in qualities if q > quality], default=high + 1) - 1
+    
+    if best is None:
+        raise ValueError(f"Cannot fit {target_format.upper()} into {target_bytes // 1024} KB")
+    return best
 
 class ImageConverter:
     def __init__(self, root):
@@ -11,6 +174,12 @@ class ImageConverter:
         # Variables
         self.source_path = tk.StringVar()
         self.target_format = tk.StringVar(value="PNG")
+        self.target_kb = tk.StringVar()
+        
+        # Background work: results come back through a queue polled by Tk
+        self.results = queue.Queue()
+        self.preview_cache = {}
+        self.preview_pending = set()
         
         # Create main frame
         main_frame = ttk.Frame(root, padding="10")
@@ -23,17 +192,38 @@ class ImageConverter:
         
         # Target format selection
         ttk.Label(main_frame, text="Convert to:").grid(row=1, column=0, sticky=tk.W)
-        formats = ["PNG", "WEBP", "JPEG", "GIF"]
-        format_combo = ttk.Combobox(main_frame, textvariable=self.target_format, values=formats, state="readonly")
+        format_combo = ttk.Combobox(main_frame, textvariable=self.target_format, values=FORMATS, state="readonly")
         format_combo.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+        format_combo.bind('<<ComboboxSelected>>', lambda event: self.update_preview())
+        
+        # Optional size budget (JPEG/WEBP search quality to fit it)
+        ttk.Label(main_frame, text="Target size (KB):").grid(row=2, column=0, sticky=tk.W)
+        ttk.Entry(main_frame, textvariable=self.target_kb, width=10).grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        self.lossless_optimize = tk.BooleanVar(value=True)
+        ttk.Checkbutton(main_frame, text="Lossless optimise PNG/GIF", 
+                        variable=self.lossless_optimize).grid(row=2, column=2, sticky=tk.W)
+        
+        # Estimated output size per format
+        preview_frame = ttk.LabelFrame(main_frame, text="Estimated Output Size", padding="5")
+        preview_frame.grid(row=3, column=0, columnspan=3, pady=5, sticky=(tk.W, tk.E))
+        self.preview_vars = {}
+        for i, name in enumerate(FORMATS):
+            self.preview_vars[name] = tk.StringVar(value=f"{name}: -")
+            ttk.Label(preview_frame, textvariable=self.preview_vars[name], width=18).grid(row=0, column=i, padx=5)
         
         # Convert button
-        ttk.Button(main_frame, text="Convert Image", command=self.convert_image).grid(row=2, column=0, columnspan=3, pady=10)
+        self.convert_btn = ttk.Button(main_frame, text="Convert Image", command=self.convert_image)
+        self.convert_btn.grid(row=4, column=0, columnspan=3, pady=10)
         
         # Status label
         self.status_var = tk.StringVar()
         status_label = ttk.Label(main_frame, textvariable=self.status_var, wraplength=300)
-        status_label.grid(row=3, column=0, columnspan=3, pady=5)
+        status_label.grid(row=5, column=0, columnspan=3, pady=5)
+        
+        self.source_path.trace_add('write', lambda *args: self.request_preview())
+        self.target_kb.trace_add('write', lambda *args: self.update_preview())
+        self.root.after(POLL_INTERVAL_MS, self.poll_results)
 
     def browse_file(self):
         filetypes = (
@@ -47,47 +237,105 @@ class ImageConverter:
         if filename:
             self.source_path.set(filename)
 
-    def convert_image(self):
+    def preview_key(self, source_path):
+        """Cache key for a file's estimates; changes when the file does."""
         try:
-            source_path = self.source_path.get()
-            if not source_path:
-                messagebox.showerror("Error", "Please select a source image")
-                return
-
-            # Open the source image
-            with Image.open(source_path) as img:
-                # Get the directory and filename without extension
-                directory = os.path.dirname(source_path)
-                filename = os.path.splitext(os.path.basename(source_path))[0]
-                
-                # Prepare target format and path
-                target_format = self.target_format.get().lower()
-                if target_format == 'jpeg':
-                    # Convert to RGB if saving as JPEG
-                    img = img.convert('RGB')
-                
-                # Create target path
-                target_path = os.path.join(directory, f"{filename}_converted.{target_format}")
-                
-                # Save with optimal settings based on format
-                if target_format == 'webp':
-                    img.save(target_path, format=target_format, quality=90, method=6)
-                elif target_format == 'jpeg':
-                    img.save(target_path, format=target_format, quality=90, optimize=True)
-                elif target_format == 'png':
-                    img.save(target_path, format=target_format, optimize=True)
-                else:
-                    img.save(target_path, format=target_format)
-                
-                self.status_var.set(f"Successfully converted!\nSaved as: {target_path}")
-                
-                # Ask if user wants to open the containing folder
-                if messagebox.askyesno("Success", "Would you like to open the containing folder?"):
-                    os.startfile(directory)
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        return (os.path.abspath(source_path), st.st_size, st.st_mtime_ns)
 
+    def request_preview(self):
+        """Estimate every format for the selected file in the background."""
+        key = self.preview_key(self.source_path.get())
+        if key is None or key in self.preview_pending:
+            self.update_preview()
+            return
+        missing = [name.lower() for name in FORMATS if (key, name.lower()) not in self.preview_cache]
+        if missing:
+            self.preview_pending.add(key)
+            thread = threading.Thread(target=self.estimate_formats, args=(key, missing), daemon=True)
+            thread.start()
+        self.update_preview()
+
+    def estimate_formats(self, key, formats):
+        try:
+            proxy, full_pixels = make_proxy(key[0])
+            for target_format in formats:
+                self.results.put(('estimate', key, target_format, estimate_size(proxy, full_pixels, target_format)))
         except Exception as e:
-            self.status_var.set(f"Error: {str(e)}")
-            messagebox.showerror("Error", f"Conversion failed: {str(e)}")
+            print(f"Error estimating {key[0]}: {str(e)}")
+        self.results.put(('estimated', key))
+
+    def update_preview(self):
+        key = self.preview_key(self.source_path.get())
+        target_kb = self.target_kb.get().strip()
+        for name, var in self.preview_vars.items():
+            marker = "> " if name == self.target_format.get() else ""
+            if target_kb and name.lower() in SIZE_SEARCH_VARIANTS:
+                var.set(f"{marker}{name}: <= {target_kb} KB")
+                continue
+            size = self.preview_cache.get((key, name.lower()))
+            text = f"~{size / 1024:.0f} KB" if size is not None else ("..." if key in self.preview_pending else "-")
+            var.set(f"{marker}{name}: {text}")
+
+    def poll_results(self):
+        """Apply results posted by background threads; runs on the Tk thread."""
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            kind = result[0]
+            if kind == 'estimate':
+                _, key, target_format, size = result
+                self.preview_cache[(key, target_format)] = size
+            elif kind == 'estimated':
+                self.preview_pending.discard(result[1])
+            elif kind == 'converted':
+                self.conversion_done(result[1], result[2])
+            elif kind == 'failed':
+                self.convert_btn.state(['!disabled'])
+                self.status_var.set(f"Error: {result[1]}")
+                messagebox.showerror("Error", f"Conversion failed: {result[1]}")
+            if kind in ('estimate', 'estimated'):
+                self.update_preview()
+        self.root.after(POLL_INTERVAL_MS, self.poll_results)
+
+    def convert_image(self):
+        source_path = self.source_path.get()
+        if not source_path:
+            messagebox.showerror("Error", "Please select a source image")
+            return
+        
+        target_format = self.target_format.get().lower()
+        target_kb = self.target_kb.get().strip()
+        lossless_optimize = self.lossless_optimize.get()
+        self.convert_btn.state(['disabled'])
+        self.status_var.set("Converting...")
+        
+        # Encoding (e.g. WEBP method=6) can take seconds; keep the window responsive
+        thread = threading.Thread(target=self.run_conversion, args=(source_path, target_format, target_kb, lossless_optimize),
+                                  daemon=True)
+        thread.start()
+
+    def run_conversion(self, source_path, target_format, target_kb, lossless_optimize):
+        try:
+            target_path, detail = convert_file(source_path, target_format, target_kb, lossless_optimize)
+            self.results.put(('converted', target_path, detail))
+        except Exception as e:
+            self.results.put(('failed', str(e)))
+
+    def conversion_done(self, target_path, detail=None):
+        self.convert_btn.state(['!disabled'])
+        status = f"Successfully converted!\nSaved as: {target_path}"
+        if detail:
+            status += f"\n{detail}"
+        self.status_var.set(status)
+        
+        # Ask if user wants to open the containing folder
+        if messagebox.askyesno("Success", "Would you like to open the containing folder?"):
+            os.startfile(os.path.dirname(target_path))
 
 def main():
     root = tk.Tk()
@@ -1,9 +1,278 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
 from pdf2docx import Converter
 from docx2pdf import convert
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from copy import deepcopy
+from io import BytesIO
 import os
+import sys
+import glob
+import json
+import math
+import time
+import queue
+import shutil
+import argparse
+import tempfile
+import threading
+
+# Pages converted per worker task; smaller ranges give finer progress
+PAGES_PER_RANGE = 5
+
+# Documents shorter than this are converted in one piece
+PARALLEL_MIN_PAGES = 20
+
+# How often the UI checks for background results, in milliseconds
+POLL_INTERVAL_MS = 100
+
+# Written into the output folder after a GUI batch run
+SUMMARY_NAME = 'conversion_summary.json'
+
+# Attributes that hold relationship ids in WordprocessingML
+REL_ATTRIBUTES = (qn('r:id'), qn('r:embed'), qn('r:link'))
+
+def count_pages(source_path):
+    cv = Converter(source_path)
+    try:
+        return len(cv.fitz_doc)
+    finally:
+        cv.close()
+
+def page_ranges(page_count, workers, pages_per_range=PAGES_PER_RANGE):
+    """Split pages into (start, end) ranges, end exclusive as pdf2docx expects."""
+    if page_count < PARALLEL_MIN_PAGES:
+        return [(0, page_count)]
+    # Enough ranges to keep every worker busy, but none longer than needed
+    size = max(1, min(pages_per_range, math.ceil(page_count / workers)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+def convert_range(source_path, part_path, start, end):
+    """Worker process: convert pages start..end-1 into their own .docx."""
+    cv = Converter(source_path)
+    try:
+        cv.convert(part_path, start=start, end=end)
+    finally:
+        cv.close()
+    return end - start
+
+def copy_relationships(element, source_part, target_part):
+    """Re-point relationship ids in a copied element from source_part to target_part."""
+    for node in element.iter():
+        for attribute in REL_ATTRIBUTES:
+            rId = node.get(attribute)
+            if rId is None or rId not in source_part.rels:
+                continue
+            rel = source_part.rels[rId]
+            if rel.is_external:
+                new_rId = target_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+            elif rel.reltype == RT.IMAGE:
+                # Adds the image bytes to the target package, deduplicated by hash
+                new_rId, _ = target_part.get_or_add_image(BytesIO(rel.target_part.blob))
+            else:
+                new_rId = target_part.relate_to(rel.target_part, rel.reltype)
+            node.set(attribute, new_rId)
+
+def merge_docx(part_paths, target_path):
+    """Join .docx files in order, keeping each one's sections and images."""
+    merged = Document(part_paths[0])
+    body = merged.element.body
+    for part_path in part_paths[1:]:
+        part = Document(part_path)
+        # Close the merged document's last section so its page setup is kept
+        body.add_section_break()
+        for element in part.element.body:
+            if element.tag == qn('w:sectPr'):
+                continue
+            copied = deepcopy(element)
+            copy_relationships(copied, part.part, merged.part)
+            body.sectPr.addprevious(copied)
+        # The part's final section settings now describe the end of the document
+        section = deepcopy(part.element.body.sectPr)
+        copy_relationships(section, part.part, merged.part)
+        body.replace(body.sectPr, section)
+    
+    # Drawing ids must be unique within the document
+    for number, doc_pr in enumerate(body.iter(qn('wp:docPr')), start=1):
+        doc_pr.set('id', str(number))
+    merged.save(target_path)
+
+def convert_pdf_pages(source_path, target_path, workers=None, cancel=None):
+    """Convert a PDF to Word, splitting long documents into page ranges.
+    
+    The ranges are converted in a process pool and the resulting documents
+    merged in page order. Yields (pages_done, page_count) as ranges finish;
+    the .docx is in place once the generator is exhausted. When the cancel
+    event is set, queued ranges are dropped and nothing is written.
+    """
+    workers = workers or os.cpu_count() or 1
+    page_count = count_pages(source_path)
+    ranges = page_ranges(page_count, workers)
+    yield 0, page_count
+    
+    work_dir = tempfile.mkdtemp(prefix='.pdf_parts_', dir=os.path.dirname(target_path) or '.')
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(ranges)))
+    try:
+        part_paths = [os.path.join(work_dir, f"part{i:05d}.docx") for i in range(len(ranges))]
+        pending = {pool.submit(convert_range, source_path, part_path, start, end)
+                   for part_path, (start, end) in zip(part_paths, ranges)}
+        pages_done = 0
+        while pending:
+            if cancel is not None and cancel.is_set():
+                return
+            # Time out now and then so a cancel is noticed promptly
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                pages_done += future.result()
+            if done:
+                yield pages_done, page_count
+    
+        if len(part_paths) == 1:
+            os.replace(part_paths[0], target_path)
+        else:
+            merge_docx(part_paths, target_path + '.partial')
+            os.replace(target_path + '.partial', target_path)
+    finally:
+        # After a cancel, don't wait for the ranges still running
+        pool.shutdown(wait=not (cancel is not None and cancel.is_set()), cancel_futures=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def convert_word_to_pdf(source_path, target_path):
+    """Run docx2pdf from any thread.
+    
+    On Windows docx2pdf drives Word over COM, which must be initialised on
+    each thread that uses it; the Tk main thread gets this for free.
+    """
+    if sys.platform != 'win32':
+        convert(source_path, target_path)
+        return
+    import pythoncom  # pywin32, installed with docx2pdf on Windows
+    pythoncom.CoInitialize()
+    try:
+        convert(source_path, target_path)
+    finally:
+        pythoncom.CoUninitialize()
+
+def find_pdfs(patterns):
+    """PDF files matching folders (searched recursively), globs or plain paths."""
+    found = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, '**', '*.pdf'), recursive=True)
+            matches += glob.glob(os.path.join(pattern, '**', '*.PDF'), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for path in sorted(matches):
+            if os.path.isfile(path) and path.lower().endswith('.pdf'):
+                found.append(os.path.abspath(path))
+    return list(dict.fromkeys(found))
+
+def plan_pdf_batch(source_paths, output_folder=None, force=False):
+    """Return (jobs, skipped) lists of (source_path, target_path) pairs.
+    
+    Without an output folder each .docx goes next to its PDF; with one, the
+    sources' folder structure below their common parent is mirrored. Files
+    whose output is already newer than the PDF are skipped unless forced.
+    Jobs are ordered largest first, so a pool that takes them in order
+    keeps every worker busy to the end (longest-processing-time first).
+    """
+    jobs = []
+    skipped = []
+    if not source_paths:
+        return jobs, skipped
+    base_folder = os.path.commonpath([os.path.dirname(path) for path in source_paths])
+    for source_path in source_paths:
+        name = os.path.splitext(os.path.relpath(source_path, base_folder))[0]
+        if output_folder:
+            target_path = os.path.join(os.path.abspath(output_folder), f"{name}_converted.docx")
+        else:
+            target_path = os.path.join(base_folder, f"{name}_converted.docx")
+        if (not force and os.path.exists(target_path)
+                and os.path.getmtime(target_path) > os.path.getmtime(source_path)):
+            skipped.append((source_path, target_path))
+        else:
+            jobs.append((source_path, target_path))
+    jobs.sort(key=lambda job: os.path.getsize(job[0]), reverse=True)
+    return jobs, skipped
+
+def convert_pdf_file(source_path, target_path):
+    """Worker process: convert a whole PDF; returns (pages, seconds)."""
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+    cv = Converter(source_path)
+    try:
+        pages = len(cv.fitz_doc)
+        cv.convert(target_path + '.partial')
+    finally:
+        cv.close()
+    os.replace(target_path + '.partial', target_path)
+    return pages, time.perf_counter() - start
+
+def convert_pdf_batch(jobs, workers=None, cancel=None):
+    """Convert (source_path, target_path) jobs on a process pool, in order.
+    
+    Yields (source_path, target_path, pages, seconds, error) in completion
+    order; error is None on success. When the cancel event is set, queued
+    jobs are dropped and the running ones are left to finish unreported.
+    """
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {pool.submit(convert_pdf_file, source_path, target_path): (source_path, target_path)
+                   for source_path, target_path in jobs}
+        remaining = set(pending)
+        while remaining:
+            if cancel is not None and cancel.is_set():
+                return
+            done, remaining = wait(remaining, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                source_path, target_path = pending[future]
+                error = future.exception()
+                pages, seconds = future.result() if error is None else (None, None)
+                yield source_path, target_path, pages, seconds, error
+    finally:
+        pool.shutdown(wait=not (cancel is not None and cancel.is_set()), cancel_futures=True)
+
+class BatchSummary:
+    """Collects per-file outcomes of a batch run for the JSON summary."""
+    
+    def __init__(self, workers):
+        self.workers = workers
+        self.start = time.perf_counter()
+        self.files = []
+    
+    def skipped(self, source_path, target_path):
+        self.files.append({'source': source_path, 'target': target_path, 'status': 'skipped'})
+    
+    def finished(self, source_path, target_path, pages, seconds, error):
+        entry = {'source': source_path, 'target': target_path, 'bytes': os.path.getsize(source_path)}
+        if error is None:
+            entry.update({'status': 'converted', 'pages': pages, 'seconds': seconds})
+        else:
+            entry.update({'status': 'failed', 'error': str(error)})
+        self.files.append(entry)
+    
+    def count(self, status):
+        return sum(1 for entry in self.files if entry['status'] == status)
+    
+    def to_dict(self, cancelled=False):
+        return {
+            'workers': self.workers,
+            'wall_seconds': time.perf_counter() - self.start,
+            'converted': self.count('converted'),
+            'skipped': self.count('skipped'),
+            'failed': self.count('failed'),
+            'cancelled': cancelled,
+            'files': self.files,
+        }
+    
+    def save(self, path, cancelled=False):
+        with open(path + '.partial', 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(cancelled), f, indent=2)
+        os.replace(path + '.partial', path)
 
 class PDFConverter:
     def __init__(self, root):
@@ -14,6 +283,10 @@ class PDFConverter:
         self.source_path = tk.StringVar()
         self.conversion_type = tk.StringVar(value="PDF to Word")
         
+        # Background conversion reports back through a queue polled by Tk
+        self.results = queue.Queue()
+        self.cancel_event = threading.Event()
+        
         # Create main frame
         main_frame = ttk.Frame(root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -31,14 +304,37 @@ class PDFConverter:
         type_combo.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
         type_combo.bind('<<ComboboxSelected>>', self.update_file_types)
         
-        # Convert button
-        ttk.Button(main_frame, text="Convert", command=self.convert_file).grid(
-            row=2, column=0, columnspan=3, pady=10)
+        # Worker processes for long PDFs
+        self.workers_var = tk.StringVar(value=str(os.cpu_count() or 1))
+        ttk.Label(main_frame, text="Workers:").grid(row=2, column=0, sticky=tk.W)
+        ttk.Spinbox(main_frame, from_=1, to=256, textvariable=self.workers_var, width=5).grid(
+            row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        # Convert and cancel buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=3, column=0, columnspan=3, pady=10)
+        self.convert_btn = ttk.Button(button_frame, text="Convert", command=self.convert_file)
+        self.convert_btn.grid(row=0, column=0, padx=5)
+        self.batch_btn = ttk.Button(button_frame, text="Batch Folder...", command=self.convert_batch)
+        self.batch_btn.grid(row=0, column=1, padx=5)
+        self.cancel_btn = ttk.Button(button_frame, text="Cancel", command=self.cancel_conversion)
+        self.cancel_btn.grid(row=0, column=2, padx=5)
+        self.cancel_btn.state(['disabled'])
+        
+        # Page progress
+        self.progress = ttk.Progressbar(main_frame, orient=tk.HORIZONTAL, mode='determinate', length=300)
+        self.progress.grid(row=4, column=0, columnspan=3, pady=5)
         
         # Status label
         self.status_var = tk.StringVar()
         status_label = ttk.Label(main_frame, textvariable=self.status_var, wraplength=300)
-        status_label.grid(row=3, column=0, columnspan=3, pady=5)
+        status_label.grid(row=5, column=0, columnspan=3, pady=5)
+        
+        # Per-file results of batch conversion
+        self.file_list = tk.Listbox(main_frame, height=8, width=60)
+        self.file_list.grid(row=6, column=0, columnspan=3, pady=5, sticky=(tk.W, tk.E))
+        
+        self.root.after(POLL_INTERVAL_MS, self.poll_results)
 
     def update_file_types(self, event=None):
         self.source_path.set("")  # Clear the current path
@@ -57,36 +353,193 @@ class PDFConverter:
             self.source_path.set(filename)
 
     def convert_file(self):
+        source_path = self.source_path.get()
+        if not source_path:
+            messagebox.showerror("Error", "Please select a source file")
+            return
         try:
-            source_path = self.source_path.get()
-            if not source_path:
-                messagebox.showerror("Error", "Please select a source file")
-                return
+            workers = int(self.workers_var.get())
+            if workers <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Workers must be a positive number")
+            return
+        
+        self.start_work("Converting...")
+        thread = threading.Thread(target=self.run_conversion,
+                                  args=(source_path, self.conversion_type.get(), workers),
+                                  daemon=True)
+        thread.start()
 
+    def convert_batch(self):
+        input_folder = filedialog.askdirectory(title="Select Folder of PDFs")
+        if not input_folder:
+            return
+        output_folder = filedialog.askdirectory(title="Select Output Folder")
+        if not output_folder:
+            return
+        try:
+            workers = int(self.workers_var.get())
+            if workers <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Workers must be a positive number")
+            return
+        
+        self.start_work("Scanning for PDFs...")
+        self.file_list.delete(0, tk.END)
+        thread = threading.Thread(target=self.run_batch, args=(input_folder, output_folder, workers),
+                                  daemon=True)
+        thread.start()
+
+    def start_work(self, status):
+        self.convert_btn.state(['disabled'])
+        self.batch_btn.state(['disabled'])
+        self.cancel_btn.state(['!disabled'])
+        self.cancel_event.clear()
+        self.progress['value'] = 0
+        self.status_var.set(status)
+
+    def cancel_conversion(self):
+        """Stop after the work already running."""
+        self.cancel_event.set()
+        self.cancel_btn.state(['disabled'])
+        self.status_var.set("Cancelling...")
+
+    def run_conversion(self, source_path, conversion_type, workers):
+        """Worker thread: never touches Tk, only posts to the results queue."""
+        try:
             directory = os.path.dirname(source_path)
             filename = os.path.splitext(os.path.basename(source_path))[0]
-
-            if self.conversion_type.get() == "PDF to Word":
+        
+            if conversion_type == "PDF to Word":
                 # Convert PDF to Word
                 target_path = os.path.join(directory, f"{filename}_converted.docx")
-                cv = Converter(source_path)
-                cv.convert(target_path)
-                cv.close()
+                for pages_done, page_count in convert_pdf_pages(source_path, target_path, workers,
+                                                                self.cancel_event):
+                    self.results.put(('progress', (pages_done, page_count)))
             else:
                 # Convert Word to PDF
                 target_path = os.path.join(directory, f"{filename}_converted.pdf")
-                convert(source_path, target_path)
-
-            self.status_var.set(f"Successfully converted!\nSaved as: {target_path}")
-            
-            if messagebox.askyesno("Success", "Would you like to open the containing folder?"):
-                os.startfile(directory)
+                convert_word_to_pdf(source_path, target_path)
+        
+            if self.cancel_event.is_set():
+                self.results.put(('cancelled', "Conversion cancelled."))
+            else:
+                self.results.put(('done', (target_path, directory)))
+        except Exception as e:
+            self.results.put(('error', str(e)))
 
+    def run_batch(self, input_folder, output_folder, workers):
+        """Worker thread: convert a folder of PDFs, largest first."""
+        summary = BatchSummary(workers)
+        summary_path = os.path.join(output_folder, SUMMARY_NAME)
+        try:
+            jobs, skipped = plan_pdf_batch(find_pdfs([input_folder]), output_folder)
+            for source_path, target_path in skipped:
+                summary.skipped(source_path, target_path)
+                self.results.put(('file', f"SKIP   {os.path.relpath(source_path, input_folder)} (up to date)"))
+            self.results.put(('batch_progress', (0, len(jobs))))
+            for done, (source_path, target_path, pages, seconds, error) in enumerate(
+                    convert_pdf_batch(jobs, workers, self.cancel_event), start=1):
+                summary.finished(source_path, target_path, pages, seconds, error)
+                name = os.path.relpath(source_path, input_folder)
+                if error is None:
+                    self.results.put(('file', f"OK     {name} ({pages} pages, {seconds:.1f}s)"))
+                else:
+                    self.results.put(('file', f"ERROR  {name}: {str(error)}"))
+                self.results.put(('batch_progress', (done, len(jobs))))
+            summary.save(summary_path, self.cancel_event.is_set())
         except Exception as e:
-            self.status_var.set(f"Error: {str(e)}")
-            messagebox.showerror("Error", f"Conversion failed: {str(e)}")
+            self.results.put(('error', str(e)))
+            return
+        
+        message = (f"Converted {summary.count('converted')} PDFs, skipped {summary.count('skipped')}, "
+                   f"{summary.count('failed')} failed.\nSummary: {summary_path}")
+        if self.cancel_event.is_set():
+            self.results.put(('cancelled', f"Batch cancelled.\n{message}"))
+        else:
+            self.results.put(('batch_done', message))
+
+    def poll_results(self):
+        """Apply queued conversion results; runs on the Tk thread."""
+        while True:
+            try:
+                kind, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                pages_done, page_count = value
+                self.progress['maximum'] = max(page_count, 1)
+                self.progress['value'] = pages_done
+                if pages_done < page_count:
+                    self.status_var.set(f"Converted {pages_done} of {page_count} pages...")
+                else:
+                    self.status_var.set(f"Converted {page_count} pages, merging...")
+                continue
+            if kind == 'batch_progress':
+                files_done, file_count = value
+                self.progress['maximum'] = max(file_count, 1)
+                self.progress['value'] = files_done
+                self.status_var.set(f"Converted {files_done} of {file_count} PDFs...")
+                continue
+            if kind == 'file':
+                self.file_list.insert(tk.END, value)
+                self.file_list.see(tk.END)
+                continue
+        
+            self.convert_btn.state(['!disabled'])
+            self.batch_btn.state(['!disabled'])
+            self.cancel_btn.state(['disabled'])
+            if kind == 'batch_done':
+                self.status_var.set(value)
+                messagebox.showinfo("Success", value)
+            elif kind == 'done':
+                target_path, directory = value
+                self.status_var.set(f"Successfully converted!\nSaved as: {target_path}")
+                if messagebox.askyesno("Success", "Would you like to open the containing folder?"):
+                    os.startfile(directory)
+            elif kind == 'cancelled':
+                self.status_var.set(value)
+            elif kind == 'error':
+                self.status_var.set(f"Error: {value}")
+                messagebox.showerror("Error", f"Conversion failed: {value}")
+        self.root.after(POLL_INTERVAL_MS, self.poll_results)
+
+def run_headless(args):
+    """Batch-convert from the command line; prints per-file lines and a JSON summary."""
+    workers = args.workers or os.cpu_count() or 1
+    summary = BatchSummary(workers)
+    jobs, skipped = plan_pdf_batch(find_pdfs(args.inputs), args.output, args.force)
+    for source_path, target_path in skipped:
+        summary.skipped(source_path, target_path)
+        print(f"SKIP   {source_path} (up to date)")
+    for source_path, target_path, pages, seconds, error in convert_pdf_batch(jobs, workers):
+        summary.finished(source_path, target_path, pages, seconds, error)
+        if error is None:
+            print(f"OK     {source_path} -> {target_path} ({pages} pages, {seconds:.1f}s)")
+        else:
+            print(f"ERROR  {source_path}: {str(error)}")
+    
+    if args.summary:
+        summary.save(args.summary)
+        print(f"Summary saved to {args.summary}")
+    else:
+        print(json.dumps(summary.to_dict(), indent=2))
+    return 1 if summary.count('failed') else 0
 
 def main():
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="PDF/Word Converter - batch convert PDFs to Word")
+        parser.add_argument("inputs", nargs='+',
+                            help="PDF files, folders (searched recursively) or globs such as 'in/**/*.pdf'")
+        parser.add_argument("-o", "--output", help="Output folder (default: next to each PDF)")
+        parser.add_argument("-w", "--workers", type=int, default=None,
+                            help="Worker processes (default: core count)")
+        parser.add_argument("--force", action="store_true", help="Convert even if the output is newer than the PDF")
+        parser.add_argument("--summary", help="Write the JSON summary to this file instead of printing it")
+        sys.exit(run_headless(parser.parse_args()))
+    
     root = tk.Tk()
     app = PDFConverter(root)
     root.mainloop()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import os
+import argparse
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageChops
+
+# zlib strategies accepted by Pillow's PNG compress_type option
+ZLIB_STRATEGIES = {
+    'default': 0,
+    'filtered': 1,
+    'huffman': 2,
+    'rle': 3,
+    'fixed': 4,
+}
+
+# zlib levels tried with every strategy
+ZLIB_LEVELS = [6, 9]
+
+def is_lossless(original, candidate):
+    """True if candidate shows exactly the same pixels as original."""
+    if original.size != candidate.size:
+        return False
+    return ImageChops.difference(original.convert('RGBA'), candidate.convert('RGBA')).getbbox() is None
+
+def palette_bits(img):
+    """Smallest PNG bit depth that can hold every palette index a P image uses.
+
+    This depends on the highest index in use, not on the number of colours:
+    an image using only indices 0 and 255 still needs 8 bits.
+    """
+    highest = img.getextrema()[1]
+    for bits in (1, 2, 4):
+        if highest < 2 ** bits:
+            return bits
+    return 8
+
+def reduce_image(img):
+    """Return lossless reductions of img, each as (label, image, extra save kwargs).
+
+    Tries stripping a fully opaque alpha channel, grayscale for neutral RGB,
+    and a palette (with a reduced bit depth) when there are at most 256
+    colours. Each reduction is checked pixel for pixel against the original.
+    """
+    candidates = [('original', img, {})]
+    base = img
+
+    # Drop alpha when every pixel is fully opaque
+    if base.mode in ('RGBA', 'LA') and base.getchannel('A').getextrema() == (255, 255):
+        base = base.convert('RGB' if base.mode == 'RGBA' else 'L')
+        candidates.append(('opaque', base, {}))
+
+    # Neutral RGB images fit in a single grey channel
+    if base.mode == 'RGB':
+        r, g, b = base.split()
+        if ImageChops.difference(r, g).getbbox() is None and ImageChops.difference(g, b).getbbox() is None:
+            base = base.convert('L')
+            candidates.append(('grayscale', base, {}))
+
+    # Few colours: index them, at the smallest bit depth that holds them
+    if base.mode in ('RGB', 'RGBA', 'L', 'LA') and base.getcolors(256) is not None:
+        if base.mode in ('RGBA', 'LA'):
+            paletted = base.convert('RGBA').quantize(256, method=Image.Quantize.FASTOCTREE)
+        else:
+            paletted = base.convert('RGB').quantize(256, method=Image.Quantize.MEDIANCUT)
+        if is_lossless(img, paletted):
+            candidates.append(('palette', paletted, {'bits': palette_bits(paletted)}))
+    elif base.mode == 'P':
+        bits = palette_bits(base)
+        if bits < 8 and is_lossless(img, base):
+            candidates.append(('palette', base, {'bits': bits}))
+    return candidates
+
+def encode_trial(img, target_format, save_kwargs):
+    # Image.save keeps its options on the image, so concurrent trials of
+    # one candidate each save their own copy
+    buffer = BytesIO()
+    img.copy().save(buffer, format=target_format, **save_kwargs)
+    return buffer.getvalue()
+
+def optimize_lossless(img, target_format='PNG', workers=None):
+    """Return (data, description) of the smallest lossless PNG or GIF encoding.
+
+    Every reduction from reduce_image is encoded with several zlib
+    level/strategy combinations (PNG) or with and without palette
+    optimisation (GIF). The trial encodes run concurrently on threads,
+    since Pillow releases the GIL while compressing.
+    """
+    target_format = target_format.upper()
+    workers = workers or min(8, os.cpu_count() or 1)
+    img.load()
+
+    trials = []
+    for label, candidate, extra in reduce_image(img):
+        if target_format == 'GIF':
+            # GIF always stores a palette; let Pillow trim it or not
+            for optimize in (False, True):
+                trials.append((f"{label}, optimize={optimize}", candidate, dict(extra, optimize=optimize)))
+            continue
+        trials.append((f"{label}, optimize", candidate, dict(extra, optimize=True)))
+        for level in ZLIB_LEVELS:
+            for strategy, compress_type in ZLIB_STRATEGIES.items():
+                trials.append((f"{label}, level {level}, {strategy}", candidate,
+                               dict(extra, compress_level=level, compress_type=compress_type)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda trial: (encode_trial(trial[1], target_format, trial[2]), trial[0]), trials)
+        return min(results, key=lambda result: len(result[0]))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Lossless PNG/GIF optimiser - keep the smallest of many trial encodes"
+    )
+    parser.add_argument("files", nargs='+', help="PNG or GIF files to optimise")
+    parser.add_argument("--in-place", action="store_true", help="Overwrite files when the result is smaller")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Concurrent trial encodes")
+    args = parser.parse_args()
+
+    for file_path in args.files:
+        if not os.path.exists(file_path):
+            print(f"File not found: {file_path}")
+            continue
+        try:
+            with Image.open(file_path) as img:
+                target_format = img.format
+                if target_format not in ('PNG', 'GIF'):
+                    print(f"Unsupported file type: {file_path}")
+                    continue
+                data, description = optimize_lossless(img, target_format, args.workers)
+        except Exception as e:
+            print(f"Error optimising {file_path}: {str(e)}")
+            continue
+
+        original_size = os.path.getsize(file_path)
+        if len(data) >= original_size:
+            print(f"{file_path}: already optimal ({original_size} bytes)")
+            continue
+        base, extension = os.path.splitext(file_path)
+        output_path = file_path if args.in_place else f"{base}_optimized{extension}"
+        with open(output_path + '.partial', 'wb') as f:
+            f.write(data)
+        os.replace(output_path + '.partial', output_path)
+        saved = 100 * (1 - len(data) / original_size)
+        print(f"{file_path}: {original_size} -> {len(data)} bytes ({saved:.1f}% smaller, {description})")
+        print(f"Saved as: {output_path}")
+
+if __name__ == "__main__":
+    main()